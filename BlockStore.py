@@ -0,0 +1,156 @@
+from typing import Iterable, Iterator, Tuple
+
+import numpy as np
+
+from DataVerificationAuction import DataBlock
+
+# 列名与类型；DataBlock 的每个字段对应一列
+COLUMNS = {
+    'block_id': np.int64,
+    'price': np.float64,
+    'base_reward_rate': np.float64,
+    'float_reward_rate': np.float64,
+    'min_reward': np.float64,
+    'max_reward': np.float64,
+    'creation_time': np.float64,
+    'ddl': np.int64,
+    'growth_spd': np.float64,
+    'verified': np.bool_,
+}
+
+
+class BlockStore:
+    """
+    列式区块存储：每个 DataBlock 字段一个 NumPy 数组。
+    evaluate() 一次向量化计算所有区块的奖励和可成交掩码，代替逐个区块调用 math.exp；
+    store[i] 返回 BlockView，仍可按 DataBlock 的属性和方法使用；同一行总是返回同一个视图对象，
+    VerificationSystem 按 id(block) 跟踪区块时，store[i] 的多次取值指向同一个区块。
+    """
+    def __init__(self, capacity: int = 1024):
+        self._size = 0
+        self._views = []  # 每行的 BlockView，首次访问时创建
+        self._columns = {name: np.zeros(max(capacity, 1), dtype=dtype) for name, dtype in COLUMNS.items()}
+
+    @classmethod
+    def from_blocks(cls, blocks: Iterable[DataBlock]) -> "BlockStore":
+        blocks = list(blocks)
+        store = cls(len(blocks))
+        for name, column in store._columns.items():
+            column[:len(blocks)] = [getattr(block, name) for block in blocks]
+        store._size = len(blocks)
+        store._views = [None] * len(blocks)
+        return store
+
+    def _grow(self, size: int):
+        capacity = len(self._columns['price'])
+        if size <= capacity:
+            return
+        capacity = max(size, capacity * 2)
+        for name, column in self._columns.items():
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
+
+    def append(self, block: DataBlock) -> "BlockView":
+        """
+        复制一个 DataBlock 到存储末尾，返回指向该行的视图。
+        """
+        self._grow(self._size + 1)
+        index = self._size
+        for name, column in self._columns.items():
+            column[index] = getattr(block, name)
+        self._size += 1
+        self._views.append(None)
+        return self._view(index)
+
+    def _view(self, index: int) -> "BlockView":
+        view = self._views[index]
+        if view is None:
+            view = self._views[index] = BlockView(self, index)
+        return view
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        返回某一列的有效部分（视图，修改会直接写回存储）。
+        """
+        return self._columns[name][:self._size]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index: int) -> "BlockView":
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("block index out of range")
+        return self._view(index)
+
+    def __iter__(self) -> Iterator["BlockView"]:
+        return (self._view(index) for index in range(self._size))
+
+    def active_mask(self, current_time: float) -> np.ndarray:
+        """
+        未验证且 creation_time <= current_time <= ddl 的区块。
+        """
+        creation_time = self.column('creation_time')
+        ddl = self.column('ddl')
+        return ~self.column('verified') & (creation_time <= current_time) & (current_time <= ddl)
+
+    def rewards(self, current_time: float, mask: np.ndarray = None) -> np.ndarray:
+        """
+        与 VerificationSystem.calculate_reward 相同的 S 型奖励，一次计算所有区块。
+        给出 mask 时只计算其中的区块，其余位置为 0。
+        """
+        columns = self._columns
+        rows = slice(0, self._size) if mask is None else np.flatnonzero(mask)
+        creation_time = columns['creation_time'][rows]
+        span = columns['ddl'][rows] - creation_time
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            x = (current_time - creation_time) / span
+            s = 1 / (1 + np.exp(-columns['growth_spd'][rows] * (2 * x - 1)))
+        min_reward = columns['min_reward'][rows]
+        reward = min_reward + (columns['max_reward'][rows] - min_reward) * s
+        reward *= columns['price'][rows] * (columns['base_reward_rate'][rows] + columns['float_reward_rate'][rows])
+        if mask is None:
+            return reward
+        result = np.zeros(self._size)
+        result[rows] = reward
+        return result
+
+    def evaluate(self, current_time: float, bid_price: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        计算活跃区块的奖励，并返回奖励不低于 bid_price 的可成交掩码。
+        :return: (rewards, eligible)，非活跃区块的奖励为 0、掩码为 False。
+        """
+        active = self.active_mask(current_time)
+        rewards = self.rewards(current_time, active)
+        return rewards, active & (rewards >= bid_price)
+
+
+class BlockView(DataBlock):
+    """
+    BlockStore 中一行的 DataBlock 视图：读写属性直接访问对应列，不复制数据。
+    """
+    __slots__ = ('_store', '_index')
+
+    def __init__(self, store: BlockStore, index: int):
+        object.__setattr__(self, '_store', store)
+        object.__setattr__(self, '_index', index)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in COLUMNS)
+        return f"BlockView({fields})"
+
+
+def _column_property(name: str, convert):
+    def getter(self):
+        return convert(self._store._columns[name][self._index])
+
+    def setter(self, value):
+        self._store._columns[name][self._index] = value
+    return property(getter, setter)
+
+
+for _name, _dtype in COLUMNS.items():
+    setattr(BlockView, _name, _column_property(_name, int if _dtype is np.int64 else bool if _dtype is np.bool_ else float))
+del _name, _dtype
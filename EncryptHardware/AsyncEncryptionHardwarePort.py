@@ -0,0 +1,107 @@
+import asyncio
+import queue
+import threading
+
+from .EncryptionHardwarePort import EncryptionHardwarePort
+
+
+def _resolve(future: asyncio.Future, result, error):
+    if future.cancelled():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+class AsyncEncryptionHardwarePort:
+    """
+    EncryptionHardwarePort 的 asyncio 版本。
+    命令进入内部队列，由一个专用线程依次在串口上执行，保证同一时刻只有一个命令占用设备；
+    多个协程可以同时 await sign_hash(...) / verify_signature(...)，
+    前一个命令返回后线程立即发送下一个，不经过事件循环调度。
+    """
+    def __init__(self, hardware_port: EncryptionHardwarePort):
+        self.hardware_port = hardware_port
+        self._queue = queue.SimpleQueue()
+        self._worker = threading.Thread(target=self._run, name="encryption-hardware-port", daemon=True)
+        self._worker.start()
+
+    @classmethod
+    def open(cls, port, baud_rate, **kwargs) -> "AsyncEncryptionHardwarePort":
+        """
+        打开串口并返回异步驱动，参数同 EncryptionHardwarePort。
+        """
+        return cls(EncryptionHardwarePort(port, baud_rate, **kwargs))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            loop, future, method, args = item
+            if future.cancelled():
+                continue
+            result, error = None, None
+            try:
+                result = method(*args)
+            except Exception as e:
+                error = e
+            loop.call_soon_threadsafe(_resolve, future, result, error)
+
+    async def _submit(self, method, *args):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put((loop, future, method, args))
+        return await future
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        排队等待执行的命令数。
+        """
+        return self._queue.qsize()
+
+    async def send_command(self, command_prefix: bytes, param: bytes, quiet: bool = False):
+        return await self._submit(self.hardware_port.send_command, command_prefix, param, quiet)
+
+    async def generate_key_pair(self, key_id: int):
+        return await self._submit(self.hardware_port.generate_key_pair, key_id)
+
+    async def read_public_key(self, key_id: int):
+        return await self._submit(self.hardware_port.read_public_key, key_id)
+
+    async def decompress_public_key(self, compressed_key: bytes):
+        return await self._submit(self.hardware_port.decompress_public_key, compressed_key)
+
+    async def sign_hash(self, key_id: int, hash_value: str):
+        return await self._submit(self.hardware_port.sign_hash, key_id, hash_value)
+
+    async def verify_signature(self, public_key: bytes, signature: bytes, hash_value: bytes):
+        return await self._submit(self.hardware_port.verify_signature, public_key, signature, hash_value)
+
+    async def output_random_number(self, quiet: bool = False):
+        return await self._submit(self.hardware_port.output_random_number, quiet)
+
+    async def set_random_number_mode(self, mode: int):
+        return await self._submit(self.hardware_port.set_random_number_mode, mode)
+
+    async def set_output_random_number_count(self, true_random_count: int, pseudo_random_count: int):
+        return await self._submit(self.hardware_port.set_output_random_number_count, true_random_count, pseudo_random_count)
+
+    async def delete_key_pair(self, key_id: int):
+        return await self._submit(self.hardware_port.delete_key_pair, key_id)
+
+    async def close(self):
+        """
+        执行完已排队的命令后停止工作线程并关闭串口。
+        """
+        self._queue.put(None)
+        await asyncio.get_running_loop().run_in_executor(None, self._worker.join)
+        self.hardware_port.ser.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
@@ -0,0 +1,159 @@
+import os
+import struct
+import threading
+from collections import OrderedDict
+
+# 文件头与记录格式：设备号、inode、大小、mtime_ns、算法编号、摘要长度，后接摘要。
+# 摘要长度为 0 的记录表示删除（失效）该条目。
+MAGIC = b'RDFDC\x01'
+RECORD = struct.Struct('<QQQqBB')
+ALGORITHM_IDS = {'md5': 1, 'sha1': 2, 'sha256': 3, 'sha512': 4}
+
+
+class DigestCache:
+    """
+    持久化的文件摘要缓存，键为 (设备号, inode, 大小, mtime_ns, 算法)。
+    文件没有变化时 get_file_hash 直接返回缓存的摘要，不再读取文件。
+    磁盘上是只追加的紧凑二进制日志，失效记录过多或超过上限时整体重写。
+    :param path: 缓存文件路径。
+    :param max_entries: 条目上限，超出时淘汰最久未使用的条目。
+    """
+    def __init__(self, path: str, max_entries: int = 1000000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._records = 0  # 日志中的记录数，包括已失效的
+        self._lock = threading.Lock()
+        evicted = self._load()
+        self._log = open(self.path, 'ab')
+        if self._log.tell() == 0:
+            self._log.write(MAGIC)
+        if evicted:
+            # 加载时淘汰的条目立即从文件中去掉，之后以更大的上限打开也不会复活
+            self._rewrite()
+        else:
+            self._maybe_compact()
+
+    def _load(self) -> bool:
+        if not os.path.isfile(self.path):
+            return False
+        with open(self.path, 'rb') as file:
+            data = file.read()
+        if not data.startswith(MAGIC):
+            # 无法识别的文件：丢弃重建
+            os.remove(self.path)
+            return False
+        offset = len(MAGIC)
+        while offset + RECORD.size <= len(data):
+            dev, ino, size, mtime_ns, algorithm_id, length = RECORD.unpack_from(data, offset)
+            offset += RECORD.size
+            if offset + length > len(data):
+                break  # 末尾不完整的记录（写入时中断）
+            key = (dev, ino, size, mtime_ns, algorithm_id)
+            if length:
+                self._entries[key] = data[offset:offset + length]
+                self._entries.move_to_end(key)
+            else:
+                self._entries.pop(key, None)
+            offset += length
+            self._records += 1
+        # max_entries 可能比写入时更小，超出的部分按最久未使用淘汰
+        return self._evict()
+
+    def _evict(self) -> bool:
+        evicted = False
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            evicted = True
+        return evicted
+
+    @staticmethod
+    def key(file_path: str, hash_algorithm: str):
+        """
+        根据文件当前状态生成缓存键。
+        """
+        algorithm_id = ALGORITHM_IDS.get(hash_algorithm.lower())
+        if algorithm_id is None:
+            raise ValueError(f"Unsupported hash algorithm: {hash_algorithm}")
+        stat = os.stat(file_path)
+        return (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns, algorithm_id)
+
+    def get(self, key):
+        """
+        返回缓存的十六进制摘要，未命中返回 None。
+        """
+        with self._lock:
+            digest = self._entries.get(key)
+            if digest is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return digest.hex()
+
+    def put(self, key, hexdigest: str):
+        digest = bytes.fromhex(hexdigest)
+        with self._lock:
+            self._entries[key] = digest
+            self._entries.move_to_end(key)
+            self._append(key, digest)
+            while len(self._entries) > self.max_entries:
+                # 淘汰也写入失效记录，重新加载时不会复活
+                evicted, _ = self._entries.popitem(last=False)
+                self._append(evicted, b'')
+            self._maybe_compact()
+
+    def invalidate(self, file_path: str):
+        """
+        使某个文件的所有缓存摘要失效（按设备号和 inode 匹配）。
+        """
+        stat = os.stat(file_path)
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == stat.st_dev and key[1] == stat.st_ino]:
+                del self._entries[key]
+                self._append(key, b'')
+            self._maybe_compact()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._rewrite()
+
+    def _append(self, key, digest: bytes):
+        self._log.write(RECORD.pack(*key, len(digest)) + digest)
+        self._records += 1
+
+    def _maybe_compact(self):
+        # 日志中的记录数超过存活条目的两倍时重写
+        if self._records > 2 * max(len(self._entries), 1024):
+            self._rewrite()
+
+    def _rewrite(self):
+        self._log.close()
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'wb') as file:
+            file.write(MAGIC)
+            for key, digest in self._entries.items():
+                file.write(RECORD.pack(*key, len(digest)) + digest)
+        os.replace(temp_path, self.path)
+        self._records = len(self._entries)
+        self._log = open(self.path, 'ab')
+
+    def flush(self):
+        with self._lock:
+            self._log.flush()
+
+    def close(self):
+        with self._lock:
+            self._log.close()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,170 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Tuple
+
+from .EncryptionHardwarePort import EncryptionHardwarePort
+
+# 每个设备的密钥槽位数
+KEY_SLOTS = 128
+
+
+class _Device:
+    """
+    池中的一个设备：一个串口、一个命令队列和一个执行线程，并记录队列深度与延迟统计。
+    """
+    def __init__(self, index: int, hardware_port: EncryptionHardwarePort):
+        self.index = index
+        self.hardware_port = hardware_port
+        self.pending = 0  # 排队中和执行中的命令数
+        self.completed = 0
+        self.errors = 0
+        self.total_wait = 0.0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self._lock = threading.Lock()
+        self._queue = queue.SimpleQueue()
+        self._worker = threading.Thread(target=self._run, name=f"encryption-device-{index}", daemon=True)
+        self._worker.start()
+
+    def submit(self, method_name: str, *args) -> Future:
+        future = Future()
+        with self._lock:
+            self.pending += 1
+        self._queue.put((future, getattr(self.hardware_port, method_name), args, time.perf_counter()))
+        return future
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            future, method, args, queued_at = item
+            started_at = time.perf_counter()
+            result, error = None, None
+            if future.set_running_or_notify_cancel():
+                try:
+                    result = method(*args)
+                except Exception as e:
+                    error = e
+            finished_at = time.perf_counter()
+            with self._lock:
+                self.pending -= 1
+                self.completed += 1
+                self.errors += error is not None
+                self.total_wait += started_at - queued_at
+                self.total_latency += finished_at - started_at
+                self.max_latency = max(self.max_latency, finished_at - started_at)
+            if error is not None:
+                future.set_exception(error)
+            elif not future.cancelled():
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        with self._lock:
+            completed = self.completed or 1
+            return {
+                "device": self.index,
+                "port": self.hardware_port.ser.port,
+                "queue_depth": self.pending,
+                "completed": self.completed,
+                "errors": self.errors,
+                "mean_wait": self.total_wait / completed,
+                "mean_latency": self.total_latency / completed,
+                "max_latency": self.max_latency,
+            }
+
+    def close(self):
+        self._queue.put(None)
+        self._worker.join()
+        self.hardware_port.ser.close()
+
+
+class EncryptionDevicePool:
+    """
+    多设备池与调度器。
+    池中的 key_id 是全局编号：设备 i 的槽位 s 对应 key_id = i * 128 + s，
+    sign_hash / read_public_key 等与密钥相关的命令发往持有该密钥的设备；
+    verify_signature、output_random_number 等无状态命令发往当前队列最短的设备。
+    所有方法立即返回 concurrent.futures.Future，调用方可以并发提交。
+    """
+    def __init__(self, hardware_ports: List[EncryptionHardwarePort]):
+        if not hardware_ports:
+            raise ValueError("EncryptionDevicePool needs at least one device")
+        self.devices = [_Device(index, hardware_port) for index, hardware_port in enumerate(hardware_ports)]
+        self._next = 0  # 队列深度相同时轮询的起点
+
+    @classmethod
+    def open(cls, ports: List[str], baud_rate: int, **kwargs) -> "EncryptionDevicePool":
+        """
+        打开多个串口，参数同 EncryptionHardwarePort。
+        """
+        return cls([EncryptionHardwarePort(port, baud_rate, **kwargs) for port in ports])
+
+    @property
+    def key_capacity(self) -> int:
+        return len(self.devices) * KEY_SLOTS
+
+    def locate_key(self, key_id: int) -> Tuple[int, int]:
+        """
+        返回全局 key_id 对应的 (设备编号, 槽位)。
+        """
+        if not 0 <= key_id < self.key_capacity:
+            raise ValueError(f"key_id {key_id} out of range, the pool holds {self.key_capacity} keys")
+        return divmod(key_id, KEY_SLOTS)
+
+    def _submit_for_key(self, key_id: int, method_name: str, *args) -> Future:
+        device_index, slot = self.locate_key(key_id)
+        return self.devices[device_index].submit(method_name, slot, *args)
+
+    def _least_loaded(self) -> _Device:
+        count = len(self.devices)
+        start = self._next
+        self._next = (start + 1) % count
+        return min((self.devices[(start + i) % count] for i in range(count)), key=lambda device: device.pending)
+
+    def generate_key_pair(self, key_id: int) -> Future:
+        return self._submit_for_key(key_id, 'generate_key_pair')
+
+    def read_public_key(self, key_id: int) -> Future:
+        return self._submit_for_key(key_id, 'read_public_key')
+
+    def sign_hash(self, key_id: int, hash_value: str) -> Future:
+        return self._submit_for_key(key_id, 'sign_hash', hash_value)
+
+    def delete_key_pair(self, key_id: int) -> Future:
+        return self._submit_for_key(key_id, 'delete_key_pair')
+
+    def decompress_public_key(self, compressed_key: bytes) -> Future:
+        return self._least_loaded().submit('decompress_public_key', compressed_key)
+
+    def verify_signature(self, public_key: bytes, signature: bytes, hash_value: bytes) -> Future:
+        return self._least_loaded().submit('verify_signature', public_key, signature, hash_value)
+
+    def output_random_number(self, quiet: bool = False) -> Future:
+        return self._least_loaded().submit('output_random_number', quiet)
+
+    def set_random_number_mode(self, mode: int) -> List[Future]:
+        # 设备状态类命令对所有设备生效
+        return [device.submit('set_random_number_mode', mode) for device in self.devices]
+
+    def set_output_random_number_count(self, true_random_count: int, pseudo_random_count: int) -> List[Future]:
+        return [device.submit('set_output_random_number_count', true_random_count, pseudo_random_count)
+                for device in self.devices]
+
+    def stats(self) -> List[dict]:
+        """
+        各设备的队列深度、完成数、平均排队时间和平均/最大执行延迟（秒）。
+        """
+        return [device.stats() for device in self.devices]
+
+    def close(self):
+        for device in self.devices:
+            device.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
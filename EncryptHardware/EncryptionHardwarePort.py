@@ -4,26 +4,195 @@ from cryptography.hazmat.primitives.asymmetric import rsa
 from cryptography.hazmat.primitives import serialization
 import time
 import hashlib
+import json
+import mmap
 import os
+import threading
+
+# 各命令的响应帧格式，按命令前缀（2 字节）查找：
+# int 表示固定的响应长度（字节），bytes 表示以该终止符结尾，
+# None 表示长度取决于设备状态（见 EncryptionHardwarePort.response_frame）。
+# 注意：这些长度是按 P-256 密钥和本驱动的命令格式推断的假设，尚未在实际设备上核对
+# （例如 testunit/pyser.py 的 SH 发送 32 字节原始摘要，而本驱动发送 64 个十六进制字符）。
+# 因此 EncryptionHardwarePort 默认不使用它们（framed=False，沿用固定等待后读取全部数据的方式）；
+# SimulatedEncryptionDevice 按这些格式实现，可放心使用 framed=True。
+RESPONSE_FRAMES = {
+    b'NK': 1,     # 生成密钥对：状态字节
+    b'RP': 33,    # 读取公钥：压缩公钥
+    b'DP': 65,    # 解压公钥：非压缩公钥
+    b'SH': 64,    # 签名：r||s
+    b'VS': 1,     # 验证签名：结果字节
+    b'OR': None,  # 输出随机数：长度由 ON 设置的数量和 BR 模式决定
+    b'BR': 1,     # 随机数模式：状态字节
+    b'ON': 1,     # 随机数数量：状态字节
+    b'DK': 1,     # 删除密钥对：状态字节
+}
+
+# BR 命令中表示伪随机数模式的取值
+PSEUDO_RANDOM_MODE = 0x59
+
+
+class PublicKeyCache:
+    """
+    公钥缓存，按 (设备, key_id) 索引压缩公钥，并按压缩公钥索引解压后的公钥。
+    槽位的公钥只会因 NK / DK 改变，EncryptionHardwarePort 发送这两个命令时自动失效对应条目。
+    :param path: 可选的 JSON 文件路径，设置后每次变更都会写回，启动时自动加载。
+        文件中的设备是串口名，重新枚举后可能指向另一块设备，其他工具（如 pyser.py）也可能已重新生成槽位，
+        因此加载的槽位公钥在本进程中先由一次 RP 确认后才会命中；解压结果与设备无关，加载后直接可用。
+    """
+    def __init__(self, path: str = None):
+        self.path = path
+        self._compressed = {}    # (device, key_id) -> 压缩公钥
+        self._decompressed = {}  # 压缩公钥 -> 非压缩公钥
+        self._unconfirmed = set()  # 从文件加载、尚未被设备确认的 (device, key_id)
+        self._lock = threading.Lock()
+        if path and os.path.isfile(path):
+            with open(path, 'r') as file:
+                data = json.load(file)
+            for device, key_id, compressed in data.get('compressed', []):
+                self._compressed[(device, key_id)] = bytes.fromhex(compressed)
+                self._unconfirmed.add((device, key_id))
+            for compressed, decompressed in data.get('decompressed', []):
+                self._decompressed[bytes.fromhex(compressed)] = bytes.fromhex(decompressed)
+
+    def get_compressed(self, device: str, key_id: int):
+        if (device, key_id) in self._unconfirmed:
+            return None
+        return self._compressed.get((device, key_id))
+
+    def get_decompressed(self, compressed_key: bytes):
+        return self._decompressed.get(bytes(compressed_key))
+
+    def get_decompressed_for_key(self, device: str, key_id: int):
+        compressed = self.get_compressed(device, key_id)
+        return None if compressed is None else self._decompressed.get(compressed)
+
+    def put_compressed(self, device: str, key_id: int, compressed_key: bytes):
+        """
+        记录设备返回的槽位公钥，同时确认该槽位；与加载的旧值不同时替换旧值。
+        """
+        compressed_key = bytes(compressed_key)
+        with self._lock:
+            self._unconfirmed.discard((device, key_id))
+            previous = self._compressed.get((device, key_id))
+            if previous == compressed_key:
+                return
+            self._compressed[(device, key_id)] = compressed_key
+            if previous is not None and previous not in self._compressed.values():
+                self._decompressed.pop(previous, None)
+            self._save()
+
+    def put_decompressed(self, compressed_key: bytes, decompressed_key: bytes):
+        with self._lock:
+            self._decompressed[bytes(compressed_key)] = bytes(decompressed_key)
+            self._save()
+
+    def invalidate(self, device: str, key_id: int):
+        """
+        删除某个槽位的缓存（压缩与解压两种形式）。
+        """
+        with self._lock:
+            self._unconfirmed.discard((device, key_id))
+            compressed = self._compressed.pop((device, key_id), None)
+            if compressed is None:
+                return
+            # 其他槽位仍在使用同一公钥时保留解压结果
+            if compressed not in self._compressed.values():
+                self._decompressed.pop(compressed, None)
+            self._save()
+
+    def _save(self):
+        if not self.path:
+            return
+        data = {
+            'compressed': [[device, key_id, compressed.hex()] for (device, key_id), compressed in self._compressed.items()],
+            'decompressed': [[compressed.hex(), decompressed.hex()] for compressed, decompressed in self._decompressed.items()],
+        }
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w') as file:
+            json.dump(data, file)
+        os.replace(temp_path, self.path)
+
 
 class EncryptionHardwarePort:
-    def __init__(self, port, baud_rate):
-        self.ser = serial.Serial(port, baud_rate, timeout=1)
+    def __init__(self, port, baud_rate, response_timeout: float = 1.0, response_frames: dict = None,
+                 public_key_cache: PublicKeyCache = None, framed: bool = False):
+        """
+        :param response_timeout: 等待一个完整响应帧的最长时间（秒）。
+        :param response_frames: 指定命令的帧格式；framed 为 True 时覆盖 RESPONSE_FRAMES 中的对应项。
+        :param public_key_cache: 公钥缓存，可在多个端口间共享或持久化；默认使用内存缓存。
+        :param framed: 为 True 时按 RESPONSE_FRAMES（未经实际设备核对）读取响应；
+            默认 False，未在 response_frames 中指定的命令仍固定等待 100 ms 后读取全部数据。
+        """
+        self.ser = serial.Serial(port, baud_rate, timeout=response_timeout)
+        self.framed = framed
+        self.response_frames = dict(RESPONSE_FRAMES) if framed else {}
+        if response_frames:
+            self.response_frames.update(response_frames)
+        self.public_key_cache = public_key_cache if public_key_cache is not None else PublicKeyCache()
+        # OR 的响应长度取决于 ON 设置的数量和当前的随机数模式
+        self.true_random_count = 32
+        self.pseudo_random_count = 32
+        self.pseudo_random_mode = False
 
+    def response_frame(self, command_prefix: bytes):
+        """
+        返回命令的响应帧格式：长度、终止符，未知命令返回 None。
+        """
+        command = bytes(command_prefix[:2])
+        if command == b'OR' and self.framed:
+            return self.pseudo_random_count if self.pseudo_random_mode else self.true_random_count
+        return self.response_frames.get(command)
 
-    def send_command(self,command_prefix: bytes, param: bytes):
+    def read_response(self, frame):
+        """
+        按帧格式读取响应：固定长度时恰好读取该长度，终止符时读到终止符为止，
+        两者都受 response_timeout 限制，超时返回已读到的部分，并丢弃输入缓冲区中已到达的数据。
+        """
+        if isinstance(frame, int):
+            response = self.ser.read(frame)
+            if len(response) < frame:
+                print(f"Response timeout: expected {frame} bytes, received {len(response)}.")
+                self.ser.reset_input_buffer()
+        else:
+            response = self.ser.read_until(frame)
+            if not response.endswith(frame):
+                print(f"Response timeout: terminator {frame.hex()} not received.")
+                self.ser.reset_input_buffer()
+        return response
+
+    def _is_complete(self, command_prefix: bytes, response) -> bool:
+        # 完整且非全零的固定长度响应才会被缓存
+        frame = self.response_frame(command_prefix)
+        return isinstance(frame, int) and len(response) == frame and response.count(b'\x00') != len(response)
+
+    def send_command(self,command_prefix: bytes, param: bytes, quiet: bool = False):
         """
         发送命令到串口并等待响应。
         :param command_prefix: 命令前缀的字节序列。
         :param param: 参数数据字节序列。
+        :param quiet: 为 True 时不打印响应内容，只打印长度（用于随机数等敏感数据）。
         :return: 从串口接收到的响应。
         """
-        self.ser.write(command_prefix + param)
-        print(f"Sent command: {(command_prefix + param).hex()}")
-        time.sleep(0.1)  # 等待设备响应，根据实际情况调整延时
-        response = self.ser.read_all()  # 读取所有可用数据
+        command = command_prefix + param
+        if command[:2] in (b'NK', b'DK') and len(command) > 2:
+            # 生成或删除密钥对会改变该槽位的公钥
+            self.public_key_cache.invalidate(self.ser.port, command[2])
+        # 丢弃上一条命令超时后才到达的字节，避免被当作本条命令响应的开头
+        self.ser.reset_input_buffer()
+        self.ser.write(command)
+        print(f"Sent command: {command.hex()}")
+        frame = self.response_frame(command_prefix)
+        if frame is not None:
+            # 按帧读取，设备一旦返回完整响应立即结束等待
+            response = self.read_response(frame)
+        else:
+            time.sleep(0.1)  # 未知命令：等待设备响应，根据实际情况调整延时
+            response = self.ser.read_all()  # 读取所有可用数据
         if response == b'\x00' * response.count(b'\x00'):
             print("Device exception: The response is all zeros.")
+        elif quiet:
+            print(f"Received response: {len(response)} bytes")
         else:
             # 打印接收到的数据的十六进制表示
             print("Received response:", response.hex())  
@@ -48,16 +217,28 @@ class EncryptionHardwarePort:
         if(key_id>127):
             print("密钥对编号>127,最多支持128个编号！")
             return 0    
+        cached = self.public_key_cache.get_compressed(self.ser.port, key_id)
+        if cached is not None:
+            return cached
         command = bytes.fromhex('52 50 ')  
-        return self.send_command(command, key_id.to_bytes(1, 'big'))
+        response = self.send_command(command, key_id.to_bytes(1, 'big'))
+        if self._is_complete(command, response):
+            self.public_key_cache.put_compressed(self.ser.port, key_id, response)
+        return response
 
 
     def decompress_public_key(self,compressed_key: bytes):
         """
         解压公钥 (DP)。
         """
+        cached = self.public_key_cache.get_decompressed(compressed_key)
+        if cached is not None:
+            return cached
         command = bytes.fromhex('44 50 ')
-        return self.send_command(command, compressed_key)
+        response = self.send_command(command, compressed_key)
+        if self._is_complete(command, response):
+            self.public_key_cache.put_decompressed(compressed_key, response)
+        return response
 
 
     def sign_hash(self,key_id: int, hash_value: bytes):
@@ -83,12 +264,13 @@ class EncryptionHardwarePort:
         # hash_length = len(hash_value).to_bytes(2, 'big', signed=True)
         return self.send_command(command_prefix, public_key +  signature +  hash_value)
 
-    def output_random_number(self):
+    def output_random_number(self, quiet: bool = False):
         """
         输出随机数 (OR)。
+        :param quiet: 为 True 时不打印随机数内容，随机数用作密钥或编号时应使用。
         """
         command_prefix = bytes.fromhex('4F 52')
-        return self.send_command(command_prefix, b'')
+        return self.send_command(command_prefix, b'', quiet)
 
     def set_random_number_mode(self,mode: int):
         """
@@ -96,16 +278,20 @@ class EncryptionHardwarePort:
         """
         mode_byte = mode.to_bytes(1, 'big', signed=True)
         command_prefix = bytes.fromhex('42 52')
+        self.pseudo_random_mode = mode == PSEUDO_RANDOM_MODE
         return self.send_command(command_prefix, mode_byte)
 
-    def set_output_random_number_count(true_random_count: int, pseudo_random_count: int):
+    def set_output_random_number_count(self, true_random_count: int, pseudo_random_count: int):
         """
-        输出随机数数量 (ON)。
+        输出随机数数量 (ON)。数量以字节计，决定之后 OR 命令的响应长度。
+        两个数量各以 4 字节大端发送；原代码计算了它们却没有发送，该参数格式同样未经实际设备核对。
         """
         command_prefix = bytes.fromhex('4F 4E')
         true_random_count_bytes = true_random_count.to_bytes(4, 'big', signed=True)
         pseudo_random_count_bytes = pseudo_random_count.to_bytes(4, 'big', signed=True)
-        return self.send_command(command_prefix , b'')
+        self.true_random_count = true_random_count
+        self.pseudo_random_count = pseudo_random_count
+        return self.send_command(command_prefix, true_random_count_bytes + pseudo_random_count_bytes)
 
     def delete_key_pair(self,key_id: int):
         """
@@ -121,41 +307,91 @@ class EncryptionHardwarePort:
 
 
 
-def get_file_hash(file_path: str, hash_algorithm: str = 'sha256') -> str:
+# 支持的哈希算法
+HASH_ALGORITHMS = {
+    'md5': hashlib.md5,
+    'sha1': hashlib.sha1,
+    'sha256': hashlib.sha256,
+    'sha512': hashlib.sha512
+}
+
+# 默认读取缓冲区大小：1 MiB
+HASH_BUFFER_SIZE = 1 << 20
+
+
+def get_file_digests(file_path: str, hash_algorithms=('sha256', 'sha512'), buffer_size: int = HASH_BUFFER_SIZE,
+                     use_mmap: bool = False, digest_cache=None) -> dict:
     """
-    提取文件的哈希摘要。
-    
+    一次读取文件，同时计算多个哈希摘要。
+    读取使用可复用的大缓冲区（readinto）或内存映射，不为每个数据块分配新的 bytes。
+    给出 digest_cache（DigestCache）时先查缓存，只计算未命中的算法，结果写回缓存。
+
     :param file_path: 文件路径，相对于当前工作目录。
-    :param hash_algorithm: 哈希算法，默认为 'sha256'。
-    :return: 文件的哈希摘要。
+    :param hash_algorithms: 哈希算法名称序列，默认同时计算 'sha256' 和 'sha512'。
+    :param buffer_size: 每次交给哈希函数的数据量。
+    :param use_mmap: 为 True 时使用内存映射读取文件。
+    :param digest_cache: 可选的摘要缓存。
+    :return: {算法名称: 十六进制摘要}。
     """
-    # 支持的哈希算法
-    hash_algorithms = {
-        'md5': hashlib.md5,
-        'sha1': hashlib.sha1,
-        'sha256': hashlib.sha256,
-        'sha512': hashlib.sha512
-    }
-    
     # 获取哈希对象
-    hash_func = hash_algorithms.get(hash_algorithm.lower())
-    if not hash_func:
-        raise ValueError(f"Unsupported hash algorithm: {hash_algorithm}")
+    names = [name.lower() for name in hash_algorithms]
+    for name in names:
+        if name not in HASH_ALGORITHMS:
+            raise ValueError(f"Unsupported hash algorithm: {name}")
 
     # 检查文件是否存在
     if not os.path.isfile(file_path):
         raise FileNotFoundError(f"No such file: '{file_path}'")
 
-    # 打开文件并读取内容
+    digests = {}
+    if digest_cache is not None:
+        # 缓存键在读取文件之前生成：读取期间文件被修改时，mtime 变化会使该条目不再命中
+        keys = {name: digest_cache.key(file_path, name) for name in names}
+        for name in names:
+            digest = digest_cache.get(keys[name])
+            if digest is not None:
+                digests[name] = digest
+        names = [name for name in names if name not in digests]
+        if not names:
+            return digests
+    hash_objs = [HASH_ALGORITHMS[name]() for name in names]
+
     with open(file_path, 'rb') as file:
-        buffer = file.read(4096)
-        hash_obj = hash_func()
-        while buffer:
-            hash_obj.update(buffer)
-            buffer = file.read(4096)
+        size = os.fstat(file.fileno()).st_size
+        if use_mmap and size > 0:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+                for offset in range(0, size, buffer_size):
+                    with view[offset:offset + buffer_size] as chunk:
+                        for hash_obj in hash_objs:
+                            hash_obj.update(chunk)
+        else:
+            buffer = bytearray(buffer_size)
+            with memoryview(buffer) as view:
+                while True:
+                    read = file.readinto(buffer)
+                    if not read:
+                        break
+                    with view[:read] as chunk:
+                        for hash_obj in hash_objs:
+                            hash_obj.update(chunk)
+
+    for name, hash_obj in zip(names, hash_objs):
+        digests[name] = hash_obj.hexdigest()
+        if digest_cache is not None:
+            digest_cache.put(keys[name], digests[name])
+    return digests
+
+
+def get_file_hash(file_path: str, hash_algorithm: str = 'sha256', digest_cache=None) -> str:
+    """
+    提取文件的哈希摘要。
     
-    # 获取哈希摘要
-    return hash_obj.hexdigest()
+    :param file_path: 文件路径，相对于当前工作目录。
+    :param hash_algorithm: 哈希算法，默认为 'sha256'。
+    :param digest_cache: 可选的摘要缓存（DigestCache），文件未变化时不再读取文件。
+    :return: 文件的哈希摘要。
+    """
+    return get_file_digests(file_path, (hash_algorithm,), digest_cache=digest_cache)[hash_algorithm.lower()]
 
 # port = 'COM5'  # 串口号，Linux 下可能是 '/dev/ttyUSB0'
 # baudrate = 460800
@@ -0,0 +1,97 @@
+import os
+import threading
+import time
+
+
+class EntropyPool:
+    """
+    由后台线程补充的熵池。
+    余量低于 low_watermark 时唤醒后台线程，从 source 批量预取随机字节直到 high_watermark；
+    take() 从不等待 I/O，池中不足时直接退回 os.urandom。
+    :param source: 无参可调用对象，每次返回一批随机字节，返回空表示暂时不可用。
+    """
+    def __init__(self, source, low_watermark: int = 4096, high_watermark: int = 65536, retry_interval: float = 1.0):
+        if low_watermark > high_watermark:
+            raise ValueError("low_watermark must not exceed high_watermark")
+        self.source = source
+        self.low_watermark = low_watermark
+        self.high_watermark = high_watermark
+        self.retry_interval = retry_interval
+        self.pool_bytes = 0      # 从池中取出的字节数
+        self.fallback_bytes = 0  # 池不足时由 os.urandom 提供的字节数
+        self._buffer = bytearray()
+        self._lock = threading.Lock()
+        self._refill = threading.Event()
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="entropy-pool", daemon=True)
+        self._worker.start()
+        self._refill.set()
+
+    def _run(self):
+        while True:
+            self._refill.wait()
+            if self._closed:
+                return
+            self._refill.clear()
+            while len(self._buffer) < self.high_watermark and not self._closed:
+                try:
+                    chunk = self.source()
+                except Exception as e:
+                    print(f"Error in EntropyPool source: {str(e)}")
+                    chunk = b''
+                if not chunk:
+                    # 熵源暂时不可用，稍后重试
+                    time.sleep(self.retry_interval)
+                    continue
+                with self._lock:
+                    self._buffer += chunk
+
+    def take(self, size: int) -> bytes:
+        """
+        取出 size 个随机字节，不阻塞。
+        """
+        with self._lock:
+            if len(self._buffer) >= size:
+                data = bytes(self._buffer[:size])
+                del self._buffer[:size]
+                self.pool_bytes += size
+                remaining = len(self._buffer)
+            else:
+                data = None
+                remaining = len(self._buffer)
+                self.fallback_bytes += size
+        if remaining < self.low_watermark:
+            self._refill.set()
+        if data is None:
+            data = os.urandom(size)
+        return data
+
+    @property
+    def available(self) -> int:
+        return len(self._buffer)
+
+    def close(self):
+        self._closed = True
+        self._refill.set()
+        self._worker.join()
+
+
+def hardware_source(hardware_port, chunk_size: int = 1024, mode: int = None):
+    """
+    把 EncryptionHardwarePort 包装成 EntropyPool 的熵源：
+    先用 ON 设置每次 OR 输出 chunk_size 字节，之后每次调用执行一次 OR。
+    该端口应只由熵池的后台线程使用。
+    :param mode: 可选，传给 set_random_number_mode（0x59 为伪随机数，其他为真随机数）。
+    """
+    hardware_port.set_output_random_number_count(chunk_size, chunk_size)
+    if mode is not None:
+        hardware_port.set_random_number_mode(mode)
+
+    def read() -> bytes:
+        # 随机数会成为会话和请求编号，不能打印到日志
+        data = hardware_port.output_random_number(quiet=True)
+        # 不完整或全零（设备异常）的响应不能当作熵
+        if not isinstance(data, bytes) or len(data) != chunk_size or data.count(b'\x00') == len(data):
+            return b''
+        return data
+    return read
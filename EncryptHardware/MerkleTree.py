@@ -0,0 +1,165 @@
+import os
+from typing import Iterable, List
+
+from .EncryptionHardwarePort import HASH_ALGORITHMS
+
+# 默认分块大小：1 MiB
+CHUNK_SIZE = 1 << 20
+
+# 叶子与内部节点使用不同前缀，防止把内部节点伪装成数据块
+LEAF_PREFIX = b'\x00'
+NODE_PREFIX = b'\x01'
+
+
+def _hash_func(hash_algorithm: str):
+    hash_func = HASH_ALGORITHMS.get(hash_algorithm.lower())
+    if not hash_func:
+        raise ValueError(f"Unsupported hash algorithm: {hash_algorithm}")
+    return hash_func
+
+
+def _leaf(hash_func, chunk) -> bytes:
+    hash_obj = hash_func(LEAF_PREFIX)
+    hash_obj.update(chunk)
+    return hash_obj.digest()
+
+
+def _node(hash_func, left: bytes, right: bytes) -> bytes:
+    return hash_func(NODE_PREFIX + left + right).digest()
+
+
+class MerkleTree:
+    """
+    文件的分块 Merkle 树摘要。
+    文件按固定大小分块，每块一个叶子；层内节点两两合并，奇数个时最后一个直接升到上一层。
+    root_hex() 可直接交给 EncryptionHardwarePort.sign_hash 签名；
+    修改部分数据后只需重算变动的块（update_chunks），
+    验证者只需下载抽查的块和 proof(index) 即可用 verify_proof 校验。
+    """
+    def __init__(self, leaves: List[bytes], chunk_size: int = CHUNK_SIZE, hash_algorithm: str = 'sha256'):
+        self.chunk_size = chunk_size
+        self.hash_algorithm = hash_algorithm.lower()
+        self._hash_func = _hash_func(hash_algorithm)
+        self.size = None  # 构建时的文件大小，未知时为 None
+        self.levels: List[List[bytes]] = []
+        self._build(list(leaves))
+
+    @classmethod
+    def from_file(cls, file_path: str, chunk_size: int = CHUNK_SIZE, hash_algorithm: str = 'sha256') -> "MerkleTree":
+        """
+        读取整个文件构建 Merkle 树。
+        """
+        hash_func = _hash_func(hash_algorithm)
+        if not os.path.isfile(file_path):
+            raise FileNotFoundError(f"No such file: '{file_path}'")
+        leaves = []
+        buffer = bytearray(chunk_size)
+        with open(file_path, 'rb') as file, memoryview(buffer) as view:
+            while True:
+                read = file.readinto(buffer)
+                if not read:
+                    break
+                with view[:read] as chunk:
+                    leaves.append(_leaf(hash_func, chunk))
+        tree = cls(leaves, chunk_size, hash_algorithm)
+        tree.size = os.path.getsize(file_path)
+        return tree
+
+    def _build(self, leaves: List[bytes]):
+        if not leaves:
+            # 空文件：一个空数据块
+            leaves = [_leaf(self._hash_func, b'')]
+        self.levels = [leaves]
+        level = leaves
+        while len(level) > 1:
+            level = [_node(self._hash_func, level[i], level[i + 1]) if i + 1 < len(level) else level[i]
+                     for i in range(0, len(level), 2)]
+            self.levels.append(level)
+
+    @property
+    def root(self) -> bytes:
+        return self.levels[-1][0]
+
+    def root_hex(self) -> str:
+        return self.root.hex()
+
+    @property
+    def chunk_count(self) -> int:
+        return len(self.levels[0])
+
+    def update_chunk(self, index: int, chunk: bytes):
+        """
+        用新的数据块替换第 index 块，只重算它到根的路径，O(log n)。
+        """
+        self.levels[0][index] = _leaf(self._hash_func, chunk)
+        self._repair([index])
+
+    def update_chunks(self, file_path: str, dirty_indices: Iterable[int]):
+        """
+        文件部分修改后，只重新读取并哈希 dirty_indices 中的块。
+        文件大小变化导致块数变化时，新增的块也会被读取。
+        """
+        size = os.path.getsize(file_path)
+        count = max(1, (size + self.chunk_size - 1) // self.chunk_size)
+        leaves = self.levels[0]
+        dirty = {index for index in dirty_indices if index < count}
+        if size != self.size:
+            # 大小变化时最后一块的长度可能变了，新增的块也必须读取
+            dirty.update(range(min(len(leaves), count) - 1, count))
+        if count != len(leaves):
+            leaves = leaves[:count] + [b''] * (count - len(leaves))
+        with open(file_path, 'rb') as file:
+            for index in sorted(dirty):
+                file.seek(index * self.chunk_size)
+                leaves[index] = _leaf(self._hash_func, file.read(self.chunk_size))
+        if count != len(self.levels[0]):
+            self._build(leaves)
+        else:
+            self._repair(dirty)
+        self.size = size
+
+    def _repair(self, indices: Iterable[int]):
+        dirty = set(indices)
+        for depth in range(1, len(self.levels)):
+            below = self.levels[depth - 1]
+            level = self.levels[depth]
+            dirty = {index // 2 for index in dirty}
+            for index in dirty:
+                left = 2 * index
+                level[index] = _node(self._hash_func, below[left], below[left + 1]) if left + 1 < len(below) else below[left]
+
+    def proof(self, index: int) -> List[bytes]:
+        """
+        第 index 块的证明：自底向上的兄弟节点列表（没有兄弟的层不占位置）。
+        兄弟在左还是在右由 verify_proof 根据 index 和块数推出，不由证明提供。
+        """
+        path = []
+        for level in self.levels[:-1]:
+            sibling = index ^ 1
+            if sibling < len(level):
+                path.append(level[sibling])
+            index //= 2
+        return path
+
+
+def verify_proof(chunk: bytes, proof: List[bytes], root: bytes, index: int, chunk_count: int,
+                 hash_algorithm: str = 'sha256') -> bool:
+    """
+    校验第 index 块（共 chunk_count 块）的数据与证明能否得到 root（可用 sign_hash 签名过的根摘要）。
+    每层兄弟节点的方向由 index 和 chunk_count 决定，换成其他块的数据和证明无法通过校验。
+    """
+    if not 0 <= index < chunk_count:
+        return False
+    hash_func = _hash_func(hash_algorithm)
+    node = _leaf(hash_func, chunk)
+    siblings = iter(proof)
+    size = chunk_count
+    while size > 1:
+        if index % 2:
+            node = _node(hash_func, next(siblings, b''), node)
+        elif index + 1 < size:
+            node = _node(hash_func, node, next(siblings, b''))
+        # 否则是该层最后一个奇数节点，直接升到上一层
+        index //= 2
+        size = (size + 1) // 2
+    return next(siblings, None) is None and node == root
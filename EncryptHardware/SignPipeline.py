@@ -0,0 +1,178 @@
+"""
+多文件哈希与签名流水线。
+文件由线程池并发计算摘要，先算完的摘要立即交给签名线程送往设备签名，
+磁盘、CPU 和串口设备同时工作，总耗时接近最慢的一级而不是各级之和。
+
+命令行：python -m EncryptHardware.SignPipeline --port COM5 --key-id 1 数据目录或文件 ...
+"""
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+from collections import namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Iterable, Iterator
+
+from .EncryptionHardwarePort import EncryptionHardwarePort, get_file_hash
+
+# 流水线输出的一条记录；出错时 error 为错误信息，digest / signature 可能为 None
+SignedFile = namedtuple('SignedFile', ['path', 'digest', 'signature', 'error'])
+
+
+def sign_files(hardware_port, paths: Iterable[str], key_id: int, hash_algorithm: str = 'sha256',
+               workers: int = None, window: int = None, digest_cache=None) -> Iterator[SignedFile]:
+    """
+    并发计算文件摘要并用设备签名，按完成顺序逐条产出 SignedFile。
+    :param hardware_port: EncryptionHardwarePort，或 sign_hash 返回 Future 的对象（如 EncryptionDevicePool）。
+        返回 Future 时签名线程不等待结果，最多 window 个文件同时在设备队列中。
+    :param workers: 计算摘要的线程数，默认等于 CPU 核心数。
+    :param window: 同时在途（已提交但尚未产出）的文件数上限，默认 workers * 4。
+    :param digest_cache: 可选的 DigestCache，未变化的文件直接使用缓存的摘要。
+    调用方提前停止迭代（或关闭生成器）时，尚未开始的摘要和签名会被取消，后台线程随之退出。
+    """
+    workers = workers or os.cpu_count() or 1
+    window = window or workers * 4
+    slots = threading.Semaphore(window)
+    stopped = threading.Event()
+    digests = queue.Queue()
+    records = queue.Queue()
+
+    def hash_file(path):
+        if stopped.is_set():
+            digests.put((path, None, "cancelled"))
+            return
+        try:
+            digests.put((path, get_file_hash(path, hash_algorithm, digest_cache), None))
+        except Exception as e:
+            digests.put((path, None, str(e)))
+
+    def feed(pool):
+        try:
+            for path in paths:
+                slots.acquire()
+                if stopped.is_set():
+                    break
+                pool.submit(hash_file, path)
+        finally:
+            pool.shutdown(wait=True, cancel_futures=stopped.is_set())
+            digests.put(None)
+
+    def signed(path, digest, future):
+        # Future 完成时由设备线程调用
+        try:
+            records.put(SignedFile(path, digest, future.result(), None))
+        except Exception as e:
+            records.put(SignedFile(path, digest, None, str(e) or type(e).__name__))
+
+    def sign():
+        pending = set()
+        while True:
+            item = digests.get()
+            if item is None:
+                break
+            path, digest, error = item
+            if error is None and stopped.is_set():
+                error = "cancelled"
+            if error is not None:
+                records.put(SignedFile(path, digest, None, error))
+                continue
+            try:
+                signature = hardware_port.sign_hash(key_id, digest)
+            except Exception as e:
+                records.put(SignedFile(path, digest, None, str(e)))
+                continue
+            if isinstance(signature, Future):
+                pending.add(signature)
+                signature.add_done_callback(pending.discard)
+                signature.add_done_callback(lambda future, path=path, digest=digest: signed(path, digest, future))
+            else:
+                records.put(SignedFile(path, digest, signature, None))
+        if stopped.is_set():
+            for future in list(pending):
+                future.cancel()
+        wait(list(pending))
+        records.put(None)
+
+    pool = ThreadPoolExecutor(workers)
+    threading.Thread(target=feed, args=(pool,), name="sign-pipeline-feed", daemon=True).start()
+    threading.Thread(target=sign, name="sign-pipeline-sign", daemon=True).start()
+    try:
+        while True:
+            record = records.get()
+            if record is None:
+                return
+            slots.release()
+            yield record
+    finally:
+        # 提前停止时让阻塞在 slots 上的 feed 线程醒来退出
+        stopped.set()
+        slots.release()
+
+
+def iter_files(targets: Iterable[str]) -> Iterator[str]:
+    """
+    展开命令行参数：文件原样返回，目录递归列出其中的文件。
+    """
+    for target in targets:
+        if os.path.isdir(target):
+            for root, _, names in os.walk(target):
+                for name in sorted(names):
+                    yield os.path.join(root, name)
+        else:
+            yield target
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="并发计算文件摘要并用加密设备签名，输出 NDJSON 记录。")
+    parser.add_argument('targets', nargs='+', help="文件或目录")
+    parser.add_argument('--port', help="串口号，如 COM5 或 /dev/ttyUSB0")
+    parser.add_argument('--baud-rate', type=int, default=460800)
+    parser.add_argument('--key-id', type=int, required=True)
+    # SH 命令的参数是 64 个十六进制字符的摘要，只能携带 sha256
+    parser.add_argument('--hash-algorithm', default='sha256', choices=['sha256'])
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--digest-cache', help="摘要缓存文件路径，未变化的文件不再重新计算摘要")
+    parser.add_argument('--simulate', action='store_true', help="使用模拟设备代替串口（会先在 key-id 上生成密钥）")
+    args = parser.parse_args(argv)
+
+    device = None
+    digest_cache = None
+    if args.simulate:
+        from .SimulatedEncryptionDevice import SimulatedEncryptionDevice
+        device = SimulatedEncryptionDevice()
+        args.port = device.port
+    elif not args.port:
+        parser.error("--port is required unless --simulate is given")
+
+    # 驱动会打印每条命令，输出记录使用原始 stdout
+    out = sys.stdout
+    sys.stdout = sys.stderr
+    try:
+        # 模拟设备按 RESPONSE_FRAMES 实现；实际设备的帧格式尚未核对，沿用固定等待
+        hardware_port = EncryptionHardwarePort(args.port, args.baud_rate, framed=device is not None)
+        if device is not None:
+            hardware_port.generate_key_pair(args.key_id)
+        if args.digest_cache:
+            from .DigestCache import DigestCache
+            digest_cache = DigestCache(args.digest_cache)
+        for record in sign_files(hardware_port, iter_files(args.targets), args.key_id, args.hash_algorithm, args.workers,
+                                 digest_cache=digest_cache):
+            out.write(json.dumps({
+                "path": record.path,
+                "digest": record.digest,
+                "signature": record.signature.hex() if isinstance(record.signature, bytes) else None,
+                "error": record.error,
+            }) + "\n")
+            out.flush()
+    finally:
+        sys.stdout = out
+        if digest_cache is not None:
+            digest_cache.close()
+        if device is not None:
+            device.close()
+
+
+if __name__ == '__main__':
+    main()
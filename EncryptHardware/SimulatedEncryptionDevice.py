@@ -0,0 +1,172 @@
+import os
+import select
+import threading
+import time
+import tty
+
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec, utils
+from cryptography.exceptions import InvalidSignature
+
+# 各命令参数的长度（字节），不含 2 字节命令前缀
+REQUEST_LENGTHS = {
+    b'NK': 1,              # key_id
+    b'RP': 1,              # key_id
+    b'DP': 33,             # 压缩公钥
+    b'SH': 1 + 64,         # key_id + 十六进制摘要（仅 sha256 的 hexdigest，其他长度拒绝）
+    b'VS': 65 + 64 + 32,   # 非压缩公钥 + r||s 签名 + 摘要
+    b'OR': 0,
+    b'BR': 1,              # 模式
+    b'ON': 8,              # 真随机数数量 + 伪随机数数量，各 4 字节
+    b'DK': 1,              # key_id
+}
+
+STATUS_OK = b'\x01'
+STATUS_FAIL = b'\xff'
+
+# 参数长度不符的命令的响应：与正常响应等长的全零（驱动报告为设备异常），其余命令返回 STATUS_FAIL
+ERROR_RESPONSES = {
+    b'RP': b'\x00' * 33,
+    b'DP': b'\x00' * 65,
+    b'SH': b'\x00' * 64,
+}
+# 命令的参数在该时间（秒）内没有收全时视为长度不符
+PARTIAL_COMMAND_TIMEOUT = 0.05
+PSEUDO_RANDOM_MODE = 0x59
+
+
+class SimulatedEncryptionDevice:
+    """
+    通过 Linux 伪终端（pty）提供的软件加密设备，用于在没有硬件时测试和基准测试
+    EncryptionHardwarePort。实现 NK/RP/DP/SH/VS/OR/BR/ON/DK 命令，使用真实的 ECDSA 密钥。
+    :param latency: 每个命令的额外延迟（秒），如 {b'SH': 0.005}。
+    :param curve: 密钥使用的椭圆曲线。
+    用法：device = SimulatedEncryptionDevice(); EncryptionHardwarePort(device.port, 460800, framed=True)
+    """
+    def __init__(self, latency: dict = None, curve: ec.EllipticCurve = None):
+        self.latency = dict(latency or {})
+        self.curve = curve or ec.SECP256R1()
+        self.commands = 0  # 已处理的命令数
+        self._keys = {}    # key_id -> 私钥
+        self._true_random_count = 32
+        self._pseudo_random_count = 32
+        self._pseudo_random_mode = False
+        self._master, self._slave = os.openpty()
+        tty.setraw(self._slave)
+        self.port = os.ttyname(self._slave)
+        self._closed = False
+        self._worker = threading.Thread(target=self._serve, name="simulated-encryption-device", daemon=True)
+        self._worker.start()
+
+    def _serve(self):
+        buffer = b''
+        while not self._closed:
+            if buffer and not select.select([self._master], [], [], PARTIAL_COMMAND_TIMEOUT)[0]:
+                # 参数不足（如 SH 的摘要比 64 个十六进制字符短）：拒绝并丢弃
+                if not self._respond(buffer[:2], ERROR_RESPONSES.get(buffer[:2], STATUS_FAIL)):
+                    return
+                buffer = b''
+                continue
+            try:
+                data = os.read(self._master, 4096)
+            except OSError:
+                break
+            if not data:
+                break
+            buffer += data
+            while len(buffer) >= 2:
+                command = buffer[:2]
+                length = REQUEST_LENGTHS.get(command)
+                if length is None:
+                    # 无法识别的命令，丢弃缓冲区重新同步
+                    buffer = b''
+                    break
+                if len(buffer) < 2 + length:
+                    break
+                param, buffer = buffer[2:2 + length], buffer[2 + length:]
+                if buffer and buffer[:1] not in {prefix[:1] for prefix in REQUEST_LENGTHS}:
+                    # 参数过长（如 SH 携带 sha512 的 128 个十六进制字符）：拒绝并丢弃多余部分
+                    buffer = b''
+                    response = ERROR_RESPONSES.get(command, STATUS_FAIL)
+                else:
+                    response = self.handle(command, param)
+                if not self._respond(command, response):
+                    return
+
+    def _respond(self, command: bytes, response: bytes) -> bool:
+        delay = self.latency.get(command, 0)
+        if delay:
+            time.sleep(delay)
+        self.commands += 1
+        try:
+            os.write(self._master, response)
+        except OSError:
+            return False
+        return True
+
+    def _public_key(self, key_id: int, point_format) -> bytes:
+        key = self._keys.get(key_id)
+        if key is None:
+            size = 33 if point_format == serialization.PublicFormat.CompressedPoint else 65
+            return b'\x00' * size
+        return key.public_key().public_bytes(serialization.Encoding.X962, point_format)
+
+    def handle(self, command: bytes, param: bytes) -> bytes:
+        """
+        执行一个命令并返回响应，响应长度与 RESPONSE_FRAMES 一致。
+        """
+        if command == b'NK':
+            self._keys[param[0]] = ec.generate_private_key(self.curve)
+            return STATUS_OK
+        if command == b'RP':
+            return self._public_key(param[0], serialization.PublicFormat.CompressedPoint)
+        if command == b'DP':
+            try:
+                key = ec.EllipticCurvePublicKey.from_encoded_point(self.curve, param)
+            except ValueError:
+                return b'\x00' * 65
+            return key.public_bytes(serialization.Encoding.X962, serialization.PublicFormat.UncompressedPoint)
+        if command == b'SH':
+            key = self._keys.get(param[0])
+            if key is None:
+                return b'\x00' * 64
+            digest = bytes.fromhex(param[1:].decode('ascii'))
+            r, s = utils.decode_dss_signature(key.sign(digest, ec.ECDSA(utils.Prehashed(hashes.SHA256()))))
+            return r.to_bytes(32, 'big') + s.to_bytes(32, 'big')
+        if command == b'VS':
+            public_key, signature, digest = param[:65], param[65:129], param[129:]
+            try:
+                key = ec.EllipticCurvePublicKey.from_encoded_point(self.curve, public_key)
+                key.verify(
+                    utils.encode_dss_signature(int.from_bytes(signature[:32], 'big'), int.from_bytes(signature[32:], 'big')),
+                    digest, ec.ECDSA(utils.Prehashed(hashes.SHA256())))
+                return STATUS_OK
+            except (InvalidSignature, ValueError):
+                return STATUS_FAIL
+        if command == b'OR':
+            return os.urandom(self._pseudo_random_count if self._pseudo_random_mode else self._true_random_count)
+        if command == b'BR':
+            self._pseudo_random_mode = param[0] == PSEUDO_RANDOM_MODE
+            return STATUS_OK
+        if command == b'ON':
+            self._true_random_count = int.from_bytes(param[:4], 'big', signed=True)
+            self._pseudo_random_count = int.from_bytes(param[4:], 'big', signed=True)
+            return STATUS_OK
+        if command == b'DK':
+            self._keys.pop(param[0], None)
+            return STATUS_OK
+        return STATUS_FAIL
+
+    def close(self):
+        self._closed = True
+        for fd in (self._slave, self._master):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,191 @@
+"""
+asyncio 服务模式：与 main.py 相同的接口，基于 Quart（ASGI），共享 verify.py 中的状态。
+空闲的长轮询/SSE 连接只占用一个协程，而不是一个线程。
+
+运行：hypercorn asgi:app --bind 0.0.0.0:5000
+"""
+from quart import Quart, jsonify, request, Response
+import asyncio
+import os
+import base64
+from verify import verifiers, Verifier, generate_session_id, submit_verification_request, record_verification_result, verdict_cache, configure_from_environment, requests_json, submit_batch_record, parse_subscribe_options
+
+app = Quart(__name__)
+
+# 验证者选择策略：'hash' 或 'two_choices'
+VERIFIER_SELECTION = os.getenv("VERIFIER_SELECTION", default="hash")
+# 订阅接口单次等待的最长时间（秒）
+SUBSCRIBE_MAX_TIMEOUT = 60.0
+
+# 按 VERIFY_DB / ENTROPY_PORT 配置存储和熵池
+configure_from_environment()
+
+
+async def wait_for_requests(verifier: Verifier, timeout: float, max_batch: int = 100):
+    """
+    Verifier.wait_for_requests 的协程版本，等待期间不占用线程。
+    """
+    batch = verifier.take_requests(max_batch)
+    if batch:
+        return batch
+    loop = asyncio.get_running_loop()
+    ready = asyncio.Event()
+    listener = lambda: loop.call_soon_threadsafe(ready.set)
+    verifier.add_listener(listener)
+    try:
+        # 注册回调后再检查一次，避免错过中间到达的请求
+        batch = verifier.take_requests(max_batch)
+        if batch:
+            return batch
+        try:
+            await asyncio.wait_for(ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        return verifier.take_requests(max_batch)
+    finally:
+        verifier.remove_listener(listener)
+
+
+@app.route('/')
+async def index():
+    return "Welcome, this is a Quart app deployed on Zeabur"
+
+
+@app.route('/keys/', methods=['POST'])
+async def handle_keys():
+    try:
+        key_info = await request.get_json()
+        key_id = key_info.get('key_id')
+        key_base64 = key_info.get('key')
+
+        if key_id is None or key_base64 is None:
+            return jsonify({"error": "Missing key_id or key"}), 400
+
+        key = base64.b64decode(key_base64)
+        existing_verifier = verifiers.get_by_public_key(key)
+        if existing_verifier:
+            if existing_verifier.verification_requests:
+                # 如果有未处理的请求，返回第一个请求的信息
+                pending_request = existing_verifier.verification_requests[0]
+                return jsonify({
+                    "message": "Verifier already exists with pending requests",
+                    "pending_request": pending_request.to_json()
+                }), 200
+            return jsonify({"message": "Key have mark"}), 201
+
+        verifiers.add(Verifier(generate_session_id(), key))
+        return jsonify({"message": "Key received successfully"}), 201
+
+    except Exception as e:
+        print(f"Error in handle_keys: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/verify_signature/', methods=['POST'])
+async def handle_verify_signature():
+    data = await request.get_json()
+    public_key = base64.b64decode(data.get('public_key'))
+    verifier_hash = base64.b64decode(data.get('verifier_hash'))
+    hash_signature = base64.b64decode(data.get('hash_signature'))
+    verification_request = submit_verification_request(public_key, verifier_hash, hash_signature, VERIFIER_SELECTION)
+    if verification_request is None:
+        return jsonify({"error": "No verifier available"}), 503
+    return Response(verification_request.to_json(), mimetype='application/json'), 202
+
+
+async def _ndjson_lines(body):
+    buffer = b""
+    async for chunk in body:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if buffer.strip():
+        yield buffer
+
+
+@app.route('/verify_signature/batch/', methods=['POST'])
+async def handle_verify_signature_batch():
+    """
+    批量提交签名验证请求，格式与 main.py 中的同名接口一致。
+    """
+    if request.mimetype == 'application/x-ndjson':
+        records = _ndjson_lines(request.body)
+    else:
+        data = await request.get_json(silent=True)
+        if not isinstance(data, list):
+            return jsonify({"error": "Expected a JSON array or an NDJSON stream"}), 400
+
+        async def iterate():
+            for record in data:
+                yield record
+        records = iterate()
+
+    async def generate():
+        index = 0
+        async for record in records:
+            yield (submit_batch_record(index, record, VERIFIER_SELECTION) + "\n").encode('utf-8')
+            index += 1
+
+    return Response(generate(), mimetype='application/x-ndjson'), 202
+
+
+@app.route('/subscribe/', methods=['POST'])
+async def handle_subscribe():
+    data = await request.get_json()
+    key_base64 = data.get('key')
+    if key_base64 is None:
+        return jsonify({"error": "Missing key"}), 400
+    verifier = verifiers.get_by_public_key(base64.b64decode(key_base64))
+    if verifier is None:
+        return jsonify({"error": "Verifier not registered"}), 404
+    try:
+        timeout, max_batch = parse_subscribe_options(data, SUBSCRIBE_MAX_TIMEOUT)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    batch = await wait_for_requests(verifier, timeout, max_batch)
+    return Response(f'{{"requests": {requests_json(batch)}}}', mimetype='application/json'), 200
+
+
+@app.route('/events/', methods=['GET'])
+async def handle_events():
+    key_base64 = request.args.get('key')
+    if key_base64 is None:
+        return jsonify({"error": "Missing key"}), 400
+    verifier = verifiers.get_by_public_key(base64.b64decode(key_base64))
+    if verifier is None:
+        return jsonify({"error": "Verifier not registered"}), 404
+
+    async def generate():
+        while True:
+            batch = await wait_for_requests(verifier, SUBSCRIBE_MAX_TIMEOUT)
+            if batch:
+                yield f"event: requests\ndata: {requests_json(batch)}\n\n".encode('utf-8')
+            else:
+                # 心跳，保持连接
+                yield b": keep-alive\n\n"
+
+    response = Response(generate(), mimetype='text/event-stream')
+    response.timeout = None  # 不限制流式响应时长
+    return response
+
+
+@app.route('/verdict_cache/', methods=['GET'])
+async def handle_verdict_cache():
+    # 验证结果缓存的命中、未命中和淘汰计数
+    return jsonify(verdict_cache.stats()), 200
+
+
+@app.route('/verify_result/', methods=['POST'])
+async def handle_verify_result():
+    data = await request.get_json()
+    request_id = data.get('request_id')
+    verification_status = data.get('verification_status')
+    if record_verification_result(request_id, verification_status) is not None:
+        return jsonify({"message": "Verification result updated successfully"}), 250
+    return jsonify({"error": "Verification request not found"}), 404
+
+
+if __name__ == '__main__':
+    app.run(port=int(os.getenv("PORT", default=5000)), host='0.0.0.0')
@@ -1,10 +1,19 @@
-from flask import Flask, jsonify,request,Response
+from flask import Flask, jsonify,request,Response,stream_with_context
 import os
-import verify
+import base64
+from verify import verifiers, Verifier, generate_session_id, submit_verification_request, record_verification_result, verdict_cache, configure_from_environment, requests_json, submit_batch_record, parse_subscribe_options
 from typing import List, Dict
 
 #import logging
 app = Flask(__name__)
+
+# 验证者选择策略：'hash' 或 'two_choices'
+VERIFIER_SELECTION = os.getenv("VERIFIER_SELECTION", default="hash")
+# 订阅接口单次等待的最长时间（秒）
+SUBSCRIBE_MAX_TIMEOUT = 60.0
+
+# 按 VERIFY_DB / ENTROPY_PORT 配置存储和熵池
+configure_from_environment()
  
 
 @app.route('/')
@@ -29,7 +38,7 @@ def handle_keys():
         session_id = generate_session_id()
         new_verifier = Verifier(session_id, key)
         #检测是否已经存在相同的验证者
-        existing_verifier =  next((v['verifier'] for v in verifiers.values()  if v['verifier'].public_key == new_verifier.public_key), None)
+        existing_verifier = verifiers.get_by_public_key(new_verifier.public_key)
         if existing_verifier:
             print(f"Verifier with public key {base64.b64encode(key).decode()} already exists.")
             if existing_verifier.verification_requests:
@@ -46,8 +55,7 @@ def handle_keys():
         
         else:
             # 将新的验证者添加到字典中
-            verifier_id = f"verifier{len(verifiers) + 1}"
-            verifiers[len(verifiers)] = {"id": verifier_id, "verifier": new_verifier}
+            verifiers.add(new_verifier)
         
             print(f"Generated session ID: {session_id}")
             print(f"Received key ID: {key_id}")        
@@ -65,17 +73,87 @@ def handle_verify_signature():
     public_key = base64.b64decode(data.get('public_key'))
     verifier_hash = base64.b64decode(data.get('verifier_hash'))
     hash_signature = base64.b64decode(data.get('hash_signature'))
-    # 使用 verifier_hash 选择验证者
-    selected_verifier = select_verifier(verifier_hash)["verifier"]
-    
-    # 创建签名验证请求
-    verification_request = create_verification_request(public_key, selected_verifier.public_key,verifier_hash, hash_signature)
-    selected_verifier.add_verification_request(verification_request)
+    # 使用 verifier_hash 选择验证者并创建签名验证请求
+    verification_request = submit_verification_request(public_key, verifier_hash, hash_signature, VERIFIER_SELECTION)
+    if verification_request is None:
+        return jsonify({"error": "No verifier available"}), 503
     # 在实际应用中，你可能会将这个请求发送到另一个服务或队列中进行处理
     # 这里我们只是返回创建的请求
     return Response(verification_request.to_json(), mimetype='application/json'), 202  # 202 Accepted    
 
 
+@app.route('/verify_signature/batch/', methods=['POST'])
+def handle_verify_signature_batch():
+    """
+    批量提交签名验证请求。
+    请求体可以是 NDJSON 流（application/x-ndjson），也可以是 JSON 数组，
+    每条记录包含 public_key、verifier_hash、hash_signature。
+    以 NDJSON 流式返回结果，单条记录出错只影响该条。
+    """
+    if request.mimetype == 'application/x-ndjson':
+        records = (line for line in request.stream if line.strip())
+    else:
+        records = request.get_json(silent=True)
+        if not isinstance(records, list):
+            return jsonify({"error": "Expected a JSON array or an NDJSON stream"}), 400
+
+    def generate():
+        for index, record in enumerate(records):
+            yield submit_batch_record(index, record, VERIFIER_SELECTION) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson'), 202
+
+
+@app.route('/subscribe/', methods=['POST'])
+def handle_subscribe():
+    """
+    长轮询：等待推送给该验证者的新请求，成批返回。
+    """
+    data = request.json
+    key_base64 = data.get('key')
+    if key_base64 is None:
+        return jsonify({"error": "Missing key"}), 400
+    verifier = verifiers.get_by_public_key(base64.b64decode(key_base64))
+    if verifier is None:
+        return jsonify({"error": "Verifier not registered"}), 404
+    try:
+        timeout, max_batch = parse_subscribe_options(data, SUBSCRIBE_MAX_TIMEOUT)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    batch = verifier.wait_for_requests(timeout, max_batch)
+    return Response(f'{{"requests": {requests_json(batch)}}}', mimetype='application/json'), 200
+
+
+@app.route('/events/', methods=['GET'])
+def handle_events():
+    """
+    Server-Sent Events：持续推送该验证者的新请求，每个事件是一批请求。
+    """
+    key_base64 = request.args.get('key')
+    if key_base64 is None:
+        return jsonify({"error": "Missing key"}), 400
+    verifier = verifiers.get_by_public_key(base64.b64decode(key_base64))
+    if verifier is None:
+        return jsonify({"error": "Verifier not registered"}), 404
+
+    def generate():
+        while True:
+            batch = verifier.wait_for_requests(SUBSCRIBE_MAX_TIMEOUT)
+            if batch:
+                yield f"event: requests\ndata: {requests_json(batch)}\n\n"
+            else:
+                # 心跳，保持连接
+                yield ": keep-alive\n\n"
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream')
+
+
+@app.route('/verdict_cache/', methods=['GET'])
+def handle_verdict_cache():
+    # 验证结果缓存的命中、未命中和淘汰计数
+    return jsonify(verdict_cache.stats()), 200
+
+
 @app.route('/verify_result/', methods=['POST'])
 def handle_verify_result():
     data = request.json
@@ -85,16 +163,9 @@ def handle_verify_result():
     # verifier_hash = base64.b64decode(data.get('verifier_hash'))
     # hash_signature = base64.b64decode(data.get('hash_signature'))
     verification_status=data.get('verification_status')
-        # 遍历 verifiers 字典，查找匹配的 request_id
-    for verifier in verifiers.values():
-        # 遍历每个 verifier 的 verification_requests 列表
-        for verification_request in verifier["verifier"].verification_requests:
-            if verification_request.request_id == request_id:
-                # 更新找到的 VerificationRequest
-
-                verification_request.verification_status= verification_status
-
-                return jsonify({"message": "Verification result updated successfully"}), 250
+    # 通过全局索引查找匹配的 request_id 并更新
+    if record_verification_result(request_id, verification_status) is not None:
+        return jsonify({"message": "Verification result updated successfully"}), 250
 
     # 如果没有找到匹配的 request_id
     return jsonify({"error": "Verification request not found"}), 404
@@ -0,0 +1,202 @@
+"""
+验证者与验证请求的存储后端。
+MemoryStore 不做持久化（默认）；SQLiteStore 把状态写入本地 SQLite（WAL 模式），
+写操作由后台线程按批次合并成事务提交，不占用请求处理的时间。
+"""
+import json
+import queue
+import sqlite3
+import threading
+import time
+from typing import Iterator, List, Tuple
+
+
+class MemoryStore:
+    """
+    不做任何持久化的存储后端，verify.py 默认使用。
+    """
+    def save_verifier(self, index: int, verifier_id: str, verifier):
+        pass
+
+    def delete_verifier(self, public_key: bytes):
+        pass
+
+    def save_request(self, verification_request):
+        pass
+
+    def update_status(self, request_id, verification_status):
+        pass
+
+    def load_verifiers(self) -> List[Tuple[int, str, str, bytes]]:
+        """
+        返回 (index, verifier_id, session_id, public_key) 列表，按 index 排序。
+        """
+        return []
+
+    def load_requests(self) -> Iterator[tuple]:
+        """
+        按写入顺序返回 (request_id, request_public_key, verifier_public_key,
+        verification_hash, hash_signature, verification_status)。
+        """
+        return iter(())
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class SQLiteStore(MemoryStore):
+    """
+    SQLite 存储后端。
+    :param path: 数据库文件路径。
+    :param batch_size: 单个事务最多合并的写操作数。
+    :param flush_interval: 收集一批写操作最多等待的秒数。
+    :param retries: 数据库被其他连接锁住等可重试错误时，每批写操作的最多尝试次数。
+    verifiers 表的 idx 由 SQLite 分配，多个进程共用一个数据库时不会互相覆盖；
+    恢复时按 idx 顺序重新编号，进程内的编号与表中的 idx 无关。
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS verifiers (
+            idx INTEGER PRIMARY KEY,
+            verifier_id TEXT NOT NULL,
+            session_id TEXT NOT NULL,
+            public_key BLOB NOT NULL);
+        CREATE UNIQUE INDEX IF NOT EXISTS verifiers_public_key ON verifiers (public_key);
+        CREATE TABLE IF NOT EXISTS verification_requests (
+            request_id BLOB NOT NULL,
+            request_public_key BLOB NOT NULL,
+            verifier_public_key BLOB NOT NULL,
+            verification_hash BLOB NOT NULL,
+            hash_signature BLOB NOT NULL,
+            verification_status TEXT NOT NULL);
+        CREATE UNIQUE INDEX IF NOT EXISTS verification_requests_request_id ON verification_requests (request_id);
+        CREATE INDEX IF NOT EXISTS verification_requests_verifier ON verification_requests (verifier_public_key);
+    """
+
+    def __init__(self, path: str, batch_size: int = 512, flush_interval: float = 0.05, retries: int = 5):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retries = retries
+        conn = self._connect()
+        conn.executescript(self.SCHEMA)
+        conn.close()
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._run, name="sqlite-store-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _run(self):
+        conn = self._connect()
+        stop = False
+        while not stop:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            operations = [operation for operation in batch if operation is not None]
+            stop = len(operations) != len(batch)
+            try:
+                if operations and self._commit(conn, operations) is not None:
+                    # 整批失败时逐条提交，只丢弃仍然失败的操作
+                    for operation in operations:
+                        error = self._commit(conn, [operation])
+                        if error is not None:
+                            print(f"Error in SQLiteStore writer, dropped {operation[0]!r}: {str(error)}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+        conn.close()
+
+    def _commit(self, conn: sqlite3.Connection, operations):
+        """
+        在一个事务中执行写操作，成功返回 None，否则返回最后的错误。
+        数据库被锁等 OperationalError 会退避重试，其他错误（如约束冲突）不重试。
+        """
+        error = None
+        for attempt in range(self.retries):
+            try:
+                with conn:
+                    for operation in operations:
+                        conn.execute(*operation)
+                return None
+            except sqlite3.OperationalError as e:
+                error = e
+                time.sleep(min(0.05 * 2 ** attempt, 1.0))
+            except sqlite3.Error as e:
+                return e
+        return error
+
+    def save_verifier(self, index: int, verifier_id: str, verifier):
+        # idx 交给 SQLite 分配：进程内的编号来自各自的计数器，写入会覆盖其他进程的行
+        self._queue.put((
+            "INSERT INTO verifiers (verifier_id, session_id, public_key) VALUES (?, ?, ?) "
+            "ON CONFLICT (public_key) DO UPDATE SET verifier_id = excluded.verifier_id, session_id = excluded.session_id",
+            (verifier_id, verifier.session_id, verifier.public_key)))
+
+    def delete_verifier(self, public_key: bytes):
+        self._queue.put(("DELETE FROM verification_requests WHERE verifier_public_key = ?", (public_key,)))
+        self._queue.put(("DELETE FROM verifiers WHERE public_key = ?", (public_key,)))
+
+    def save_request(self, verification_request):
+        self._queue.put((
+            "INSERT OR REPLACE INTO verification_requests (request_id, request_public_key, verifier_public_key, "
+            "verification_hash, hash_signature, verification_status) VALUES (?, ?, ?, ?, ?, ?)",
+            (verification_request.request_id,
+             verification_request.request_public_key,
+             verification_request.verifier_public_key,
+             verification_request.verification_hash,
+             verification_request.hash_signature,
+             json.dumps(verification_request.verification_status))))
+
+    def update_status(self, request_id, verification_status):
+        self._queue.put((
+            "UPDATE verification_requests SET verification_status = ? WHERE request_id = ?",
+            (json.dumps(verification_status), request_id)))
+
+    def load_verifiers(self) -> List[Tuple[int, str, str, bytes]]:
+        conn = self._connect()
+        try:
+            return conn.execute(
+                "SELECT idx, verifier_id, session_id, public_key FROM verifiers ORDER BY idx").fetchall()
+        finally:
+            conn.close()
+
+    def load_requests(self) -> Iterator[tuple]:
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "SELECT request_id, request_public_key, verifier_public_key, verification_hash, "
+                "hash_signature, verification_status FROM verification_requests ORDER BY rowid")
+            while True:
+                rows = cursor.fetchmany(4096)
+                if not rows:
+                    break
+                for row in rows:
+                    yield row[:5] + (json.loads(row[5]),)
+        finally:
+            conn.close()
+
+    def flush(self):
+        """
+        阻塞直到已提交的写操作全部落盘。
+        """
+        self._queue.join()
+
+    def close(self):
+        """
+        提交剩余的写操作并停止后台写线程，可重复调用。
+        """
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
@@ -1,7 +1,10 @@
 from dataclasses import dataclass, field
 from queue import Full
+import heapq
+import itertools
+import threading
 import time
-from typing import List
+from typing import Dict, List, Optional, Set, Tuple
 
 import math
 
@@ -63,26 +66,83 @@ class Verifier:
             print(f"Bid rejected: Bid price {self.bid_price} is higher than the block reward {reward}.")
             return False
 
+# 计算出的越过时刻之后稍等片刻再验证，避免浮点误差导致奖励差一点点达不到报价
+CROSSING_MARGIN = 1e-3
+
 class VerificationSystem:
     def __init__(self):
         self.blocks: List[DataBlock] = []
         self.verifiers: List[Verifier] = []
         self.up_for_auction: List[DataBlock] = []  # 待验证区块列表
+        # 活跃区块（未验证且未过DDL），按加入顺序保存，键为加入序号
+        self._active: Dict[int, DataBlock] = {}
+        self._active_seq: Dict[int, int] = {}  # id(block) -> 加入序号
+        # 按DDL排序的最小堆 (ddl, 加入序号)，用于 O(log n) 移除过期区块
+        self._deadlines: List[Tuple[int, int]] = []
+        self._seq = itertools.count()
+        # 拍卖定时器队列：最小堆 (唤醒时刻, 加入序号, 版本)，版本不匹配的条目已作废
+        self._timers: List[Tuple[float, int, int]] = []
+        self._timer_versions: Dict[int, int] = {}
+        # 全局递增的定时器版本：重新安排或取消后，旧条目的版本不可能再匹配
+        self._timer_version = itertools.count(1)
+        # 每个区块最早越过报价的验证者，以及 id(verifier) -> 该验证者最早越过的区块序号
+        self._timer_owners: Dict[int, Verifier] = {}
+        self._owned: Dict[int, Set[int]] = {}
+        self._lock = threading.RLock()
+        self._wakeup = threading.Event()
+        self._running = False
+        self._stopped = False
 
     def add_block(self, block: DataBlock):
-        self.blocks.append(block)
+        with self._lock:
+            self.blocks.append(block)
+            if not block.verified:
+                seq = next(self._seq)
+                self._active[seq] = block
+                self._active_seq[id(block)] = seq
+                heapq.heappush(self._deadlines, (block.ddl, seq))
+                if self._running:
+                    self._schedule(seq, block, time.time())
+                    self._wakeup.set()
 
     def add_verifier(self, verifier: Verifier):
-        self.verifiers.append(verifier)
+        with self._lock:
+            self.verifiers.append(verifier)
+            if self._running:
+                # 新验证者可能让任何区块更早成交，全部重新计算
+                current_time = time.time()
+                for seq, block in list(self._active.items()):
+                    self._schedule(seq, block, current_time)
+                self._wakeup.set()
+
+    def _deactivate(self, block: DataBlock):
+        # 区块离开活跃集合；堆中的条目在到期时惰性丢弃
+        seq = self._active_seq.pop(id(block), None)
+        if seq is not None:
+            self._active.pop(seq, None)
+            self._cancel(seq)
+
+    def _expire(self, current_time: int):
+        # 弹出所有已过DDL的区块
+        while self._deadlines and self._deadlines[0][0] < current_time:
+            _, seq = heapq.heappop(self._deadlines)
+            block = self._active.pop(seq, None)
+            if block is not None:
+                self._active_seq.pop(id(block), None)
+                self._cancel(seq)
 
     def scan_for_verification(self)-> List[DataBlock]:
-        up_for_auction: List[DataBlock]=[]
-        # 检索所有未验证且在DDL内的区块，将它们加入待验证列表
-        current_time = int(time.time())
-        for block in self.blocks:
-            if not block.verified and current_time <= block.ddl:
-                up_for_auction.append(block)
-        return up_for_auction
+        # 返回所有未验证且在DDL内的区块；只访问活跃区块，不遍历历史区块
+        with self._lock:
+            self._expire(int(time.time()))
+            up_for_auction: List[DataBlock] = []
+            for block in list(self._active.values()):
+                if block.verified:
+                    # 在 verify_block 之外被标记为已验证的区块
+                    self._deactivate(block)
+                else:
+                    up_for_auction.append(block)
+            return up_for_auction
         
     def calculate_reward(self, block: DataBlock, current_time: int) -> float:
         t = current_time- block.creation_time
@@ -90,13 +150,77 @@ class VerificationSystem:
         reward = (block.min_reward + (block.max_reward - block.min_reward) * (sigmoid((t / T),block.growth_spd)))
         return block.price * (block.base_reward_rate + block.float_reward_rate) * reward
 
-    def verify_block(self, block: DataBlock, verifier: Verifier):
+    def crossing_time(self, block: DataBlock, verifier: Verifier, current_time: float) -> Optional[float]:
+        """
+        求区块奖励首次不低于验证者报价的时刻。
+        奖励曲线单调，由 reward = P * (b + f) * (min + (max - min) * s)，s = 1 / (1 + exp(-k(2x - 1)))
+        可解出 x = (1 - ln(1 / s - 1) / k) / 2，t = creation_time + x * (ddl - creation_time)。
+        已满足时返回 current_time，DDL 前不会满足时返回 None。
+        """
+        if block.ddl <= block.creation_time:
+            return None
+        if self.calculate_reward(block, current_time) >= verifier.bid_price:
+            return current_time
+        if self.calculate_reward(block, block.ddl) < verifier.bid_price:
+            return None
+        # 此时奖励在 (current_time, ddl] 内单调增长并越过报价
+        scale = block.price * (block.base_reward_rate + block.float_reward_rate)
+        s = (verifier.bid_price / scale - block.min_reward) / (block.max_reward - block.min_reward)
+        x = (1 - math.log(1 / s - 1) / block.growth_spd) / 2
+        crossing = block.creation_time + x * (block.ddl - block.creation_time)
+        return min(max(crossing, current_time) + CROSSING_MARGIN, block.ddl)
+
+    def _schedule(self, seq: int, block: DataBlock, current_time: float):
+        # 为区块安排下一次唤醒：所有验证者中最早的越过时刻
+        self._cancel(seq)
+        best: Optional[Tuple[float, Verifier]] = None
+        for verifier in self.verifiers:
+            when = self.crossing_time(block, verifier, current_time)
+            if when is not None and (best is None or when < best[0]):
+                best = (when, verifier)
+        if best is None:
+            return  # 到DDL前没有验证者能成交，等待过期
+        version = next(self._timer_version)
+        self._timer_versions[seq] = version
+        self._timer_owners[seq] = best[1]
+        self._owned.setdefault(id(best[1]), set()).add(seq)
+        heapq.heappush(self._timers, (best[0], seq, version))
+        if len(self._timers) > 2 * len(self._timer_versions) + 64:
+            # 作废的条目过多时重建堆，只保留仍然有效的定时器
+            self._timers = [timer for timer in self._timers if self._timer_versions.get(timer[1]) == timer[2]]
+            heapq.heapify(self._timers)
+
+    def _cancel(self, seq: int):
+        # 作废区块的定时器；堆中的条目在弹出时丢弃
+        if self._timer_versions.pop(seq, None) is not None:
+            owner = self._timer_owners.pop(seq)
+            self._owned[id(owner)].discard(seq)
+
+    def _run_block(self, seq: int, block: DataBlock, current_time: float):
+        if block.verified:
+            # 已在调度之外被标记为已验证（如通过另一个引用调用 verify_block）
+            self._deactivate(block)
+            return
+        # 按验证者顺序尝试成交，与逐秒轮询时的优先顺序一致
+        for verifier in self.verifiers:
+            if self.crossing_time(block, verifier, current_time) != current_time:
+                continue
+            if self.verify_block(block, verifier, current_time):
+                # 胜出者报价已变化，重新安排以它为最早越过者的区块
+                for other in list(self._owned.get(id(verifier), ())):
+                    self._schedule(other, self._active[other], current_time)
+                return
+        self._schedule(seq, block, current_time)
+
+    def verify_block(self, block: DataBlock, verifier: Verifier, current_time: float = None):
         # 只在待验证列表中操作
-        current_time = int(time.time())
+        if current_time is None:
+            current_time = int(time.time())
         reward = self.calculate_reward(block, current_time)
         if verifier.bid_price <= reward:
             verifier.total_score += reward
             block.verified = True  # 修改状态为已验证
+            self._deactivate(block)
             #test 验证成功则提高报价
             verifier.bid_price = reward+1
             print(f"Verifier {verifier.verifier_id} verified block {block.block_id} and earned {reward:.2f} points.")
@@ -104,24 +228,58 @@ class VerificationSystem:
         print(f"verifier ={verifier.verifier_id} verifier.bid_price={verifier.bid_price} verification failed for block_id ={block.block_id},now reward={reward:.2f}.")
         return False
 
+    def _next_wakeup(self) -> Optional[float]:
+        # 丢弃堆顶已作废的定时器，返回下一次越过或过期的时刻
+        while self._timers and self._timer_versions.get(self._timers[0][1]) != self._timers[0][2]:
+            heapq.heappop(self._timers)
+        candidates = []
+        if self._timers:
+            candidates.append(self._timers[0][0])
+        if self._deadlines:
+            # int(now) > ddl 时区块过期
+            candidates.append(self._deadlines[0][0] + 1)
+        return min(candidates) if candidates else None
+
     def start_auction(self):
-        # 拍卖逻辑
+        """
+        事件驱动的拍卖：不按固定间隔轮询，只在下一次奖励越过某个验证者报价或区块到期时唤醒，
+        所有区块成交或过期后结束。拍卖期间可继续 add_block / add_verifier，或调用 stop_auction 结束。
+        """
         print("start auction")
-        start_time = time.time()
-        while time.time() - start_time < 60:  # 假设拍卖持续1分钟
-            self.up_for_auction=self.scan_for_verification()
-            if(self.up_for_auction.__len__==0):
-                return
-            for block in self.up_for_auction:
-                for verifier in self.verifiers:
-                    if(self.verify_block(block, verifier)):
+        with self._lock:
+            self._running = True
+            self._stopped = False
+            self.up_for_auction = self.scan_for_verification()
+            current_time = time.time()
+            for seq, block in list(self._active.items()):
+                self._schedule(seq, block, current_time)
+        try:
+            while True:
+                with self._lock:
+                    self._wakeup.clear()
+                    current_time = time.time()
+                    self._expire(int(current_time))
+                    while self._timers and self._timers[0][0] <= current_time:
+                        _, seq, version = heapq.heappop(self._timers)
+                        if self._timer_versions.get(seq) != version:
+                            continue
+                        self._run_block(seq, self._active[seq], current_time)
+                    if self._stopped or not self._active:
                         break
-            # 这里可以添加逻辑来接受出价和选择胜出的验证者
-            time.sleep(1)  # 每秒检查一次
-            
+                    next_time = self._next_wakeup()
+                self._wakeup.wait(None if next_time is None else max(0.0, next_time - time.time()))
+        finally:
+            with self._lock:
+                self._running = False
+
         for verifier in self.verifiers:
             print(verifier)
 
+    def stop_auction(self):
+        with self._lock:
+            self._stopped = True
+            self._wakeup.set()
+
 
 # 示例
 system = VerificationSystem()
@@ -0,0 +1,70 @@
+"""
+奖励计算基准：逐个 DataBlock 调用 VerificationSystem.calculate_reward（math.exp），
+对比 BlockStore.evaluate 一次向量化计算所有活跃区块的奖励和可成交掩码。
+
+运行：python testunit/bench_block_store.py [区块数 ...，默认 10000 100000 1000000]
+"""
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from BlockStore import BlockStore
+from DataVerificationAuction import DataBlock, VerificationSystem
+
+BID_PRICE = 4.0
+
+
+def make_blocks(count, now):
+    rng = random.Random(count)
+    blocks = []
+    for block_id in range(count):
+        block = DataBlock(block_id=block_id, price=rng.uniform(5, 20), base_reward_rate=0.05,
+                          float_reward_rate=rng.uniform(0, 0.05), min_reward=1.0, max_reward=10.0,
+                          ddl=int(now) + rng.randint(-30, 120), growth_spd=rng.uniform(0.5, 4))
+        block.creation_time = now - rng.uniform(0, 60)
+        block.verified = rng.random() < 0.2
+        blocks.append(block)
+    return blocks
+
+
+def per_object(system, blocks, current_time):
+    # 改动前的方式：逐个区块检查并计算奖励
+    rewards = []
+    eligible = []
+    for block in blocks:
+        if not block.verified and block.is_verifiable(current_time):
+            reward = system.calculate_reward(block, current_time)
+            rewards.append(reward)
+            eligible.append(reward >= BID_PRICE)
+        else:
+            rewards.append(0.0)
+            eligible.append(False)
+    return np.array(rewards), np.array(eligible)
+
+
+def best_of(call, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = call()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+if __name__ == '__main__':
+    counts = [int(arg) for arg in sys.argv[1:]] or [10000, 100000, 1000000]
+    system = VerificationSystem()
+    now = time.time()
+    for count in counts:
+        blocks = make_blocks(count, now)
+        store = BlockStore.from_blocks(blocks)
+        (expected_rewards, expected_eligible), slow = best_of(lambda: per_object(system, blocks, now), 1 if count >= 1000000 else 3)
+        (rewards, eligible), fast = best_of(lambda: store.evaluate(now, BID_PRICE), 5)
+        assert np.allclose(rewards, expected_rewards) and (eligible == expected_eligible).all()
+        print(f"{count:>8d} blocks  per-object {slow * 1000:9.1f} ms  vectorized {fast * 1000:7.1f} ms  "
+              f"{slow / fast:6.1f}x  eligible {int(eligible.sum())}")
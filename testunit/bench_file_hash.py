@@ -0,0 +1,54 @@
+"""
+文件哈希基准：对比原先 4096 字节分块、每个算法各读一遍的方式，
+与 get_file_digests 的大缓冲区 readinto / mmap 单遍多摘要方式。
+
+运行：python testunit/bench_file_hash.py [文件大小 MiB ...，默认 1 16 256]
+"""
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from EncryptHardware.EncryptionHardwarePort import get_file_digests
+
+ALGORITHMS = ('sha256', 'sha512')
+
+
+def legacy_hash(file_path, hash_algorithm):
+    # 改动前的 get_file_hash
+    with open(file_path, 'rb') as file:
+        buffer = file.read(4096)
+        hash_obj = hashlib.new(hash_algorithm)
+        while buffer:
+            hash_obj.update(buffer)
+            buffer = file.read(4096)
+    return hash_obj.hexdigest()
+
+
+def measure(call, size):
+    call()  # 预热页缓存
+    start = time.perf_counter()
+    result = call()
+    elapsed = time.perf_counter() - start
+    return result, size / elapsed / (1 << 20)
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1, 16, 256]
+    for size_mib in sizes:
+        size = size_mib << 20
+        with tempfile.NamedTemporaryFile(delete=False) as file:
+            for _ in range(size_mib):
+                file.write(os.urandom(1 << 20))
+            path = file.name
+        try:
+            legacy, legacy_rate = measure(lambda: {name: legacy_hash(path, name) for name in ALGORITHMS}, size)
+            readinto, readinto_rate = measure(lambda: get_file_digests(path, ALGORITHMS), size)
+            mapped, mapped_rate = measure(lambda: get_file_digests(path, ALGORITHMS, use_mmap=True), size)
+            assert legacy == readinto == mapped
+            print(f"{size_mib:5d} MiB  sha256+sha512  legacy 2 passes {legacy_rate:7.1f} MiB/s  "
+                  f"readinto {readinto_rate:7.1f} MiB/s  mmap {mapped_rate:7.1f} MiB/s")
+        finally:
+            os.unlink(path)
@@ -0,0 +1,115 @@
+"""
+EncryptionHardwarePort 协议基准：在模拟设备（pty）上测量各命令的往返延迟和每秒操作数。
+包括同步驱动、asyncio 驱动、多设备池，以及旧的固定 100 ms 等待方式作为对照。
+
+运行：python testunit/bench_hardware_port.py [每条命令的模拟延迟毫秒数，默认 2]
+"""
+import asyncio
+import contextlib
+import hashlib
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from EncryptHardware.EncryptionHardwarePort import EncryptionHardwarePort, PublicKeyCache
+from EncryptHardware.AsyncEncryptionHardwarePort import AsyncEncryptionHardwarePort
+from EncryptHardware.EncryptionDevicePool import EncryptionDevicePool
+from EncryptHardware.SimulatedEncryptionDevice import SimulatedEncryptionDevice
+
+BAUD_RATE = 460800
+ITERATIONS = 200
+HASH_HEX = hashlib.sha256(b'benchmark').hexdigest()
+
+
+def report(name, samples):
+    samples = sorted(samples)
+    total = sum(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    print(f"{name:28s} mean {statistics.mean(samples) * 1000:7.2f} ms  "
+          f"p50 {samples[len(samples) // 2] * 1000:7.2f} ms  p99 {p99 * 1000:7.2f} ms  "
+          f"{len(samples) / total:8.0f} ops/s")
+
+
+def timed(call, iterations=ITERATIONS):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_sync(latency):
+    with SimulatedEncryptionDevice(latency) as device:
+        # 使用独立的公钥缓存；测量 RP 时先失效缓存，DP 直接发送命令，测量真实往返
+        port = EncryptionHardwarePort(device.port, BAUD_RATE, public_key_cache=PublicKeyCache(), framed=True)
+        port.generate_key_pair(1)
+        compressed = port.read_public_key(1)
+        public_key = port.decompress_public_key(compressed)
+        signature = port.sign_hash(1, HASH_HEX)
+        digest = bytes.fromhex(HASH_HEX)
+
+        results = [
+            ("NK generate_key_pair", timed(lambda: port.generate_key_pair(2))),
+            ("RP read_public_key", timed(lambda: (port.public_key_cache.invalidate(device.port, 1), port.read_public_key(1)))),
+            ("RP read_public_key (cached)", timed(lambda: port.read_public_key(1))),
+            ("DP decompress_public_key", timed(lambda: port.send_command(b'DP', compressed))),
+            ("SH sign_hash", timed(lambda: port.sign_hash(1, HASH_HEX))),
+            ("VS verify_signature", timed(lambda: port.verify_signature(public_key, signature, digest))),
+            ("OR output_random_number", timed(port.output_random_number)),
+            ("BR set_random_number_mode", timed(lambda: port.set_random_number_mode(1))),
+            ("ON set_output_random_count", timed(lambda: port.set_output_random_number_count(32, 32))),
+            ("DK delete_key_pair", timed(lambda: port.delete_key_pair(2))),
+        ]
+        # 对照：默认（framed=False）固定等待 100 ms
+        legacy = EncryptionHardwarePort(device.port, BAUD_RATE)
+        results.append(("SH sign_hash (sleep 100 ms)", timed(lambda: legacy.sign_hash(1, HASH_HEX), 10)))
+        port.ser.close()
+        legacy.ser.close()
+    return results
+
+
+def bench_async(latency):
+    async def run():
+        with SimulatedEncryptionDevice(latency) as device:
+            async with AsyncEncryptionHardwarePort.open(device.port, BAUD_RATE, framed=True) as port:
+                await port.generate_key_pair(1)
+                start = time.perf_counter()
+                await asyncio.gather(*(port.sign_hash(1, HASH_HEX) for _ in range(ITERATIONS)))
+                return time.perf_counter() - start
+    return asyncio.run(run())
+
+
+def bench_pool(latency, device_count):
+    devices = [SimulatedEncryptionDevice(latency) for _ in range(device_count)]
+    with EncryptionDevicePool.open([device.port for device in devices], BAUD_RATE, framed=True) as pool:
+        for index in range(device_count):
+            pool.generate_key_pair(index * 128).result()
+        start = time.perf_counter()
+        futures = [pool.sign_hash((i % device_count) * 128, HASH_HEX) for i in range(ITERATIONS)]
+        for future in futures:
+            future.result()
+        elapsed = time.perf_counter() - start
+    for device in devices:
+        device.close()
+    return elapsed
+
+
+if __name__ == '__main__':
+    delay = float(sys.argv[1]) / 1000 if len(sys.argv) > 1 else 0.002
+    latency = {command: delay for command in (b'NK', b'RP', b'DP', b'SH', b'VS', b'OR', b'BR', b'ON', b'DK')}
+    # 驱动每条命令都会打印收发内容，测量时屏蔽输出
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        results = bench_sync(latency)
+    print(f"simulated device latency: {delay * 1000:.1f} ms per command")
+    for name, samples in results:
+        report(name, samples)
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        elapsed = bench_async(latency)
+    print(f"{'async SH, concurrent':28s} {ITERATIONS / elapsed:8.0f} ops/s")
+    for device_count in (1, 2, 4):
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            elapsed = bench_pool(latency, device_count)
+        print(f"{'pool SH, ' + str(device_count) + ' devices':28s} {ITERATIONS / elapsed:8.0f} ops/s")
@@ -0,0 +1,70 @@
+"""
+VerificationRequest 内存与序列化基准。
+对比原先基于 __dict__、request_id 为 str(os.urandom(16)) 的实现
+与现在的 __slots__ + 16 字节 request_id + 缓存 to_json 的实现。
+
+运行：python testunit/bench_request_memory.py
+"""
+import base64
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from verify import VerificationRequest
+
+COUNT = 200000
+PUBLIC_KEY = os.urandom(33)
+VERIFIER_KEY = os.urandom(33)
+
+
+class DictVerificationRequest:
+    # 改动前的 VerificationRequest
+    def __init__(self, request_id, request_public_key, verifier_public_key, verification_hash, hash_signature, verification_status):
+        self.request_id = request_id
+        self.verifier_public_key = verifier_public_key
+        self.request_public_key = request_public_key
+        self.verification_hash = verification_hash
+        self.hash_signature = hash_signature
+        self.verification_status = verification_status
+
+    def to_json(self):
+        return json.dumps({
+            'request_id': self.request_id,
+            'verifier_public_key': base64.b64encode(self.verifier_public_key).decode('utf-8'),
+            'request_public_key': base64.b64encode(self.request_public_key).decode('utf-8'),
+            'verification_hash': base64.b64encode(self.verification_hash).decode('utf-8'),
+            'hash_signature': base64.b64encode(self.hash_signature).decode('utf-8'),
+            'verification_status': self.verification_status
+        })
+
+
+def measure(name, make_request):
+    # 哈希和签名每个请求各不相同，公钥在请求之间共享
+    payloads = [(os.urandom(32), os.urandom(64)) for _ in range(COUNT)]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    requests = [make_request(verification_hash, hash_signature) for verification_hash, hash_signature in payloads]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(5):
+        for verification_request in requests:
+            verification_request.to_json()
+    elapsed = time.perf_counter() - start
+    print(f"{name:8s} {(after - before) / COUNT:8.1f} bytes/request  "
+          f"to_json x5: {elapsed:6.2f}s ({5 * COUNT / elapsed:10.0f} calls/s)")
+
+
+if __name__ == '__main__':
+    measure("before", lambda verification_hash, hash_signature: DictVerificationRequest(
+        str(os.urandom(16)), PUBLIC_KEY, VERIFIER_KEY, verification_hash, hash_signature, 'pending'))
+    measure("after", lambda verification_hash, hash_signature: VerificationRequest(
+        os.urandom(16), PUBLIC_KEY, VERIFIER_KEY, verification_hash, hash_signature, 'pending'))
+
+    # from_json 往返
+    verification_request = VerificationRequest(os.urandom(16), PUBLIC_KEY, VERIFIER_KEY, os.urandom(32), os.urandom(64), 'pending')
+    assert VerificationRequest.from_json(verification_request.to_json()).to_json() == verification_request.to_json()
@@ -0,0 +1,66 @@
+"""
+verify.py 注册表的多线程压力测试。
+多个线程同时注册验证者、提交验证请求并回写结果，
+输出不同线程数下的吞吐量，并检查请求没有丢失或重复。
+
+运行：python testunit/stress_verify.py
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import verify
+
+VERIFIER_COUNT = 200
+REQUESTS_PER_THREAD = 20000
+
+
+def reset():
+    verify.verifiers = verify.VerifierRegistry()
+    verify.request_index.clear()
+
+
+def register_all(_):
+    # 每个线程都尝试注册全部公钥，重复注册应返回同一条目
+    for i in range(VERIFIER_COUNT):
+        verify.verifiers.add(verify.Verifier(verify.generate_session_id(), b"verifier-key-%d" % i))
+
+
+def submit_and_answer(worker: int):
+    for i in range(REQUESTS_PER_THREAD):
+        verification_request = verify.submit_verification_request(
+            b"uploader-%d" % worker, os.urandom(32), b"signature", 'two_choices')
+        # 一半的请求立即回写结果
+        if i % 2 == 0:
+            verify.record_verification_result(verification_request.request_id, True)
+
+
+def run(threads: int):
+    reset()
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(register_all, range(threads)))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(submit_and_answer, range(threads)))
+    elapsed = time.perf_counter() - start
+
+    total = threads * REQUESTS_PER_THREAD
+    entries = list(verify.verifiers.values())
+    queued = [r.request_id for entry in entries for r in entry["verifier"].verification_requests]
+    pending = sum(entry["verifier"].pending_count for entry in entries)
+
+    assert len(entries) == VERIFIER_COUNT, f"registered {len(entries)} verifiers"
+    assert len({entry["id"] for entry in entries}) == VERIFIER_COUNT, "duplicated verifier id"
+    assert len(queued) == total, f"queued {len(queued)} of {total} requests"
+    assert len(set(queued)) == total, "duplicated request"
+    assert len(verify.request_index) == total, "request index out of sync"
+    assert pending == total - (REQUESTS_PER_THREAD + 1) // 2 * threads, f"pending_count={pending}"
+    print(f"threads={threads:2d}  requests={total:7d}  {total / elapsed:10.0f} req/s")
+
+
+if __name__ == '__main__':
+    for threads in (1, 2, 4, 8, 16):
+        run(threads)
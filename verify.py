@@ -4,37 +4,74 @@ A module that provide encrypted port verification.
 """
 from flask import Flask, jsonify,request,Response
 import os
+import atexit
 import base64
-from typing import List, Dict
+import bisect
+from array import array
+import hashlib
+import itertools
+import json
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import List, Dict, Optional
 import uuid
+from storage import MemoryStore
+import verify_engine
 
 class VerificationRequest:
+    """
+    签名验证请求。
+    request_id 保存为 16 字节原始值，JSON 中以十六进制字符串表示。
+    使用 __slots__ 压缩内存；to_json 的结果会缓存，verification_status 变化时失效，
+    其余字段创建后不应再修改。
+    """
+    __slots__ = ('request_id', 'verifier_public_key', 'request_public_key', 'verification_hash',
+                 'hash_signature', '_verification_status', '_json')
+
     def __init__(self,request_id, request_public_key, verifier_public_key, verification_hash, hash_signature,verification_status):
         self.request_id=request_id
         self.verifier_public_key = verifier_public_key
         self.request_public_key = request_public_key
         self.verification_hash = verification_hash
         self.hash_signature = hash_signature
-        self.verification_status = verification_status
+        self._verification_status = verification_status
+        self._json = None
+
+    @property
+    def verification_status(self):
+        return self._verification_status
+
+    @verification_status.setter
+    def verification_status(self, verification_status):
+        self._verification_status = verification_status
+        self._json = None
         
     def verify(self) -> bool:
-        # 这里应该实现实际的验证逻辑
-        # 为了演示，我们假设验证总是成功
-        self.verification_status = True
-        return self.verification_status
+        # 在进程内用软件 ECDSA 验证签名，结果通过 record_verification_result 回写，
+        # 以便维护验证者的 pending_count、存储和验证结果缓存
+        verdict = verify_engine.verify_signature(
+            self.request_public_key, self.verification_hash, self.hash_signature)
+        if record_verification_result(self.request_id, verdict) is None:
+            # 不在 request_index 中的请求（未提交给验证者）只更新自身
+            self.verification_status = verdict
+        return verdict
     
     def to_json(self):
-        return json.dumps({
-            'request_id': self.request_id,
-            'verifier_public_key': base64.b64encode(self.verifier_public_key).decode('utf-8'),
-            'request_public_key': base64.b64encode(self.request_public_key).decode('utf-8'),
-            'verification_hash': base64.b64encode(self.verification_hash).decode('utf-8'),
-            'hash_signature': base64.b64encode(self.hash_signature).decode('utf-8'),
-            'verification_status': self.verification_status
-        })
+        if self._json is None:
+            self._json = json.dumps({
+                'request_id': self.request_id.hex(),
+                'verifier_public_key': base64.b64encode(self.verifier_public_key).decode('utf-8'),
+                'request_public_key': base64.b64encode(self.request_public_key).decode('utf-8'),
+                'verification_hash': base64.b64encode(self.verification_hash).decode('utf-8'),
+                'hash_signature': base64.b64encode(self.hash_signature).decode('utf-8'),
+                'verification_status': self._verification_status
+            })
+        return self._json
 
     @classmethod
-    def from_json(cls, json_str):
+    def from_json(cls, json_data):
         # 如果 json_data 已经是一个字典，直接使用它
         if isinstance(json_data, dict):
             data = json_data
@@ -42,7 +79,7 @@ class VerificationRequest:
             # 否则，假设它是一个 JSON 字符串，并解析它
             data = json.loads(json_data)
         return cls(
-            request_id=data['request_id'],
+            request_id=bytes.fromhex(data['request_id']),
             request_public_key=base64.b64decode(data['request_public_key']),
             verifier_public_key=base64.b64decode(data['verifier_public_key']),
             verification_hash=base64.b64decode(data['verification_hash']),
@@ -51,15 +88,92 @@ class VerificationRequest:
         )
  
  
+# 每个验证者待推送队列的最大长度
+OUTBOX_LIMIT = 10000
+
+
 class Verifier:
     def __init__(self, session_id: str, public_key: str):
         self.session_id = session_id
         self.public_key = public_key
         self.verification_requests: List[VerificationRequest] = []
+        self.pending_count = 0  # 尚未返回结果的请求数
         self.is_verified = False
+        # 每个验证者一把锁，保护请求列表、计数和待推送队列
+        self._lock = threading.RLock()
+        # 尚未推送给验证者的新请求，由订阅接口取走。
+        # 有上限：从不订阅的验证者只保留最近的 OUTBOX_LIMIT 个，更早的请求仍可通过 request_index 查到
+        self._outbox = deque(maxlen=OUTBOX_LIMIT)
+        self._outbox_ready = threading.Condition(self._lock)
+        self._listeners = []  # 新请求到达时调用的回调，供 asyncio 订阅者使用
 
     def add_verification_request(self, request: VerificationRequest):
-        self.verification_requests.append(request)
+        with self._outbox_ready:
+            self.verification_requests.append(request)
+            request_index[request.request_id] = request
+            if request.verification_status != 'pending':
+                # 已有结果（命中验证结果缓存）的请求只建立索引，不推送给验证者
+                pending = False
+            else:
+                pending = True
+                self.pending_count += 1
+                self._outbox.append(request)
+                self._outbox_ready.notify_all()
+        store.save_request(request)
+        if pending:
+            for listener in list(self._listeners):
+                listener()
+
+    def restore_verification_request(self, request: VerificationRequest):
+        """
+        启动时从存储恢复请求：只有待处理的请求会重新推送，不写回存储。
+        """
+        with self._lock:
+            self.verification_requests.append(request)
+            request_index[request.request_id] = request
+            if request.verification_status == 'pending':
+                self.pending_count += 1
+                self._outbox.append(request)
+
+    def set_verification_status(self, request: VerificationRequest, verification_status):
+        """
+        在该验证者的锁内更新请求状态，并维护 pending_count。
+        """
+        with self._lock:
+            if request.verification_status == 'pending' and verification_status != 'pending':
+                self.pending_count -= 1
+            request.verification_status = verification_status
+
+    def take_requests(self, max_batch: int = 100) -> List[VerificationRequest]:
+        """
+        不等待，取走当前已排队的新请求；排队期间已有结果的请求直接丢弃。
+        """
+        with self._outbox_ready:
+            batch = []
+            while self._outbox and len(batch) < max_batch:
+                request = self._outbox.popleft()
+                if request.verification_status == 'pending':
+                    batch.append(request)
+        return batch
+
+    def wait_for_requests(self, timeout: float = 30.0, max_batch: int = 100) -> List[VerificationRequest]:
+        """
+        等待新加入的验证请求并成批取走，超时返回空列表。
+        """
+        deadline = time.monotonic() + timeout
+        with self._outbox_ready:
+            while True:
+                batch = self.take_requests(max_batch)
+                remaining = deadline - time.monotonic()
+                if batch or remaining <= 0:
+                    return batch
+                self._outbox_ready.wait(remaining)
+
+    def add_listener(self, listener):
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        self._listeners.remove(listener)
 
     def verify(self) -> bool:
         # 这里应该实现实际的验证逻辑
@@ -72,18 +186,490 @@ class Verifier:
             return self.public_key == other.public_key
         return False    
  
- # 用于存储验证者的字典
+class HashRing:
+    """
+    带虚拟节点的一致性哈希环。
+    每个验证者在环上占 vnodes 个点，成员变化只会重新映射约 1/n 的哈希空间。
+    环上的点按顺序分成若干个长度不超过 2 * bucket_size 的有序段，
+    加入或移除一个验证者只复制它的点所在的段和段索引，不重建整个环。
+    """
+    def __init__(self, vnodes: int = 64, bucket_size: int = 512):
+        self.vnodes = vnodes
+        self.bucket_size = bucket_size
+        # (points, owners, maxes)：points[i] / owners[i] 为第 i 段的点和对应的注册表编号，
+        # maxes[i] 为第 i 段最大的点。成员变化时复制受影响的段后整体替换（写时复制），读取方无需加锁。
+        # 段使用 array 而不是 list：复制是整块内存拷贝，不需要逐个元素增加引用计数。
+        self._state = ([], [], array('Q'))
+        self._write_lock = threading.Lock()
+
+    @staticmethod
+    def _hash(data: bytes) -> int:
+        return int.from_bytes(hashlib.sha256(data).digest()[:8], byteorder='big')
+
+    def _replica_points(self, public_key: bytes):
+        for replica in range(self.vnodes):
+            yield self._hash(public_key + replica.to_bytes(4, byteorder='big'))
+
+    def add_many(self, members):
+        """
+        一次加入多个 (index, public_key)，只排序一次，用于启动时恢复。
+        """
+        with self._write_lock:
+            points, owners, _ = self._state
+            ring = [(point, index) for bucket, bucket_owners in zip(points, owners)
+                    for point, index in zip(bucket, bucket_owners)]
+            for index, public_key in members:
+                ring.extend((point, index) for point in self._replica_points(public_key))
+            ring.sort()
+            size = self.bucket_size
+            points = [array('Q', [point for point, _ in ring[start:start + size]]) for start in range(0, len(ring), size)]
+            owners = [array('q', [index for _, index in ring[start:start + size]]) for start in range(0, len(ring), size)]
+            self._state = (points, owners, array('Q', [bucket[-1] for bucket in points]))
+
+    def add(self, index: int, public_key: bytes):
+        """
+        加入一个验证者：复制段索引（O(n / bucket_size)）和至多 vnodes 个段（每段 O(bucket_size)）。
+        """
+        with self._write_lock:
+            points, owners, maxes = self._state
+            points, owners, maxes = list(points), list(owners), array('Q', maxes)
+            copied = set()
+            for point in self._replica_points(public_key):
+                if not points:
+                    points.append(array('Q', [point]))
+                    owners.append(array('q', [index]))
+                    maxes.append(point)
+                    copied.add(id(points[0]))
+                    continue
+                i = min(bisect.bisect_left(maxes, point), len(points) - 1)
+                if id(points[i]) not in copied:
+                    points[i], owners[i] = array('Q', points[i]), array('q', owners[i])
+                    copied.add(id(points[i]))
+                pos = bisect.bisect_left(points[i], point)
+                points[i].insert(pos, point)
+                owners[i].insert(pos, index)
+                maxes[i] = points[i][-1]
+                if len(points[i]) > 2 * self.bucket_size:
+                    # 段过长时对半拆分，两半都是新复制的段
+                    half = len(points[i]) // 2
+                    points[i:i + 1] = [points[i][:half], points[i][half:]]
+                    owners[i:i + 1] = [owners[i][:half], owners[i][half:]]
+                    maxes[i:i + 1] = array('Q', [points[i][-1], points[i + 1][-1]])
+                    copied.update((id(points[i]), id(points[i + 1])))
+            self._state = (points, owners, maxes)
+
+    @staticmethod
+    def _find(points, owners, maxes, point: int, index: int):
+        # 返回编号为 index 的点 point 所在的 (段, 位置)，不存在时返回 None；相同的点可能跨段
+        i = bisect.bisect_left(maxes, point)
+        while i < len(points):
+            bucket = points[i]
+            pos = bisect.bisect_left(bucket, point)
+            while pos < len(bucket) and bucket[pos] == point:
+                if owners[i][pos] == index:
+                    return i, pos
+                pos += 1
+            if pos < len(bucket):
+                return None
+            i += 1
+        return None
+
+    def remove(self, index: int, public_key: bytes):
+        """
+        移除一个验证者，复制的范围与 add 相同。
+        """
+        with self._write_lock:
+            points, owners, maxes = self._state
+            points, owners, maxes = list(points), list(owners), array('Q', maxes)
+            copied = set()
+            for point in self._replica_points(public_key):
+                found = self._find(points, owners, maxes, point, index)
+                if found is None:
+                    continue
+                i, pos = found
+                if id(points[i]) not in copied:
+                    points[i], owners[i] = array('Q', points[i]), array('q', owners[i])
+                    copied.add(id(points[i]))
+                del points[i][pos]
+                del owners[i][pos]
+                if points[i]:
+                    maxes[i] = points[i][-1]
+                else:
+                    del points[i], owners[i], maxes[i]
+            self._state = (points, owners, maxes)
+
+    def _walk(self, key: bytes):
+        # 从 key 的位置顺时针遍历环上的编号（读取一份快照，不加锁）
+        points, owners, maxes = self._state
+        if not points:
+            return
+        point = self._hash(key)
+        i = bisect.bisect_right(maxes, point)
+        if i == len(points):
+            i, pos = 0, 0
+        else:
+            pos = bisect.bisect_right(points[i], point)
+        yield from owners[i][pos:]
+        for step in range(1, len(points)):
+            yield from owners[(i + step) % len(points)]
+        yield from owners[i][:pos]
+
+    def lookup(self, key: bytes) -> Optional[int]:
+        """
+        返回 key 顺时针方向第一个虚拟节点所属的编号，O(log n)。
+        """
+        return next(self._walk(key), None)
+
+    def candidates(self, key: bytes, count: int = 2) -> List[int]:
+        """
+        从 key 的位置顺时针取最多 count 个不同的编号。
+        """
+        owners: List[int] = []
+        for owner in self._walk(key):
+            if owner not in owners:
+                owners.append(owner)
+                if len(owners) == count:
+                    break
+        return owners
+
+
+class VerdictCache:
+    """
+    已知验证结果的 LRU/TTL 缓存，键为 (public_key, verification_hash, hash_signature) 的摘要。
+    重复提交的签名直接得到缓存的结果，不再创建新的验证任务。
+    """
+    def __init__(self, capacity: int = 100000, ttl: float = 3600.0):
+        self.capacity = capacity
+        self.ttl = ttl
+        self._entries = OrderedDict()  # 摘要 -> (验证结果, 过期时间)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(public_key: bytes, verification_hash: bytes, hash_signature: bytes) -> bytes:
+        digest = hashlib.sha256()
+        for part in (public_key, verification_hash, hash_signature):
+            digest.update(len(part).to_bytes(4, byteorder='big'))
+            digest.update(part)
+        return digest.digest()
+
+    def get(self, key: bytes):
+        """
+        返回缓存的验证结果，未命中或已过期时返回 None。
+        """
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None:
+                if item[1] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return item[0]
+                del self._entries[key]
+                self.evictions += 1
+            self.misses += 1
+            return None
+
+    def put(self, key: bytes, verdict):
+        with self._lock:
+            self._entries[key] = (verdict, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "capacity": self.capacity,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class VerifierRegistry:
+    """
+    验证者注册表。
+    按编号保存 {"id": ..., "verifier": ...} 条目（select_verifier 使用的视图），
+    同时按公钥建立索引，使查重、查找和删除都是 O(1)。
+    公钥索引按条带加锁，编号由原子计数器分配，哈希环写时复制，
+    因此多线程下注册不同公钥、选择验证者可以并行进行。
+    """
+    def __init__(self, vnodes: int = 64, stripes: int = 64):
+        self._entries: Dict[int, dict] = {}
+        self._by_public_key: Dict[bytes, int] = {}
+        self._ids = itertools.count()
+        self._stripes = [threading.Lock() for _ in range(stripes)]
+        self.ring = HashRing(vnodes)
+
+    def _stripe(self, public_key: bytes) -> threading.Lock:
+        return self._stripes[hash(public_key) % len(self._stripes)]
+
+    def add(self, verifier: Verifier) -> dict:
+        """
+        注册验证者并返回其条目；公钥已存在时返回已有条目。
+        """
+        with self._stripe(verifier.public_key):
+            index = self._by_public_key.get(verifier.public_key)
+            if index is not None:
+                return self._entries[index]
+            index = next(self._ids)
+            entry = {"id": f"verifier{index + 1}", "verifier": verifier}
+            self._entries[index] = entry
+            self._by_public_key[verifier.public_key] = index
+        # 条目先写入，再加入哈希环，保证环上的编号总能找到条目
+        self.ring.add(index, verifier.public_key)
+        store.save_verifier(index, entry["id"], verifier)
+        return entry
+
+    def restore(self, rows):
+        """
+        启动时批量恢复 (index, verifier_id, verifier) 条目，不写回存储。
+        """
+        next_index = 0
+        members = []
+        for index, verifier_id, verifier in rows:
+            self._entries[index] = {"id": verifier_id, "verifier": verifier}
+            self._by_public_key[verifier.public_key] = index
+            members.append((index, verifier.public_key))
+            next_index = max(next_index, index + 1)
+        self.ring.add_many(members)
+        self._ids = itertools.count(next_index)
+
+    def get_by_public_key(self, public_key: bytes) -> Optional[Verifier]:
+        index = self._by_public_key.get(public_key)
+        if index is None:
+            return None
+        return self._entries[index]["verifier"]
+
+    def remove(self, public_key: bytes) -> Optional[dict]:
+        """
+        按公钥注销验证者，返回被删除的条目。
+        """
+        with self._stripe(public_key):
+            index = self._by_public_key.pop(public_key, None)
+            if index is None:
+                return None
+            # 先移出哈希环，再删除条目
+            self.ring.remove(index, public_key)
+            entry = self._entries.pop(index)
+        store.delete_verifier(public_key)
+        verifier = entry["verifier"]
+        # 同步移除该验证者名下的请求索引
+        with verifier._lock:
+            for verification_request in verifier.verification_requests:
+                request_index.pop(verification_request.request_id, None)
+        return entry
+
+    def select(self, verifier_hash: bytes, strategy: str = 'hash') -> Optional[dict]:
+        """
+        通过一致性哈希环为 verifier_hash 选择验证者条目。
+        strategy 为 'two_choices' 时在环上取两个候选，选择待处理请求较少的一个。
+        """
+        if strategy == 'two_choices':
+            candidates = [self._entries.get(index) for index in self.ring.candidates(verifier_hash, 2)]
+            candidates = [entry for entry in candidates if entry is not None]
+            if not candidates:
+                return None
+            return min(candidates, key=lambda entry: entry["verifier"].pending_count)
+        if strategy != 'hash':
+            raise ValueError(f"Unsupported selection strategy: {strategy}")
+        # 读到旧的哈希环时，所选验证者可能刚被注销，重新查找即可
+        while True:
+            index = self.ring.lookup(verifier_hash)
+            if index is None:
+                return None
+            entry = self._entries.get(index)
+            if entry is not None:
+                return entry
+
+    def __getitem__(self, index: int) -> dict:
+        return self._entries[index]
+
+    def __contains__(self, index) -> bool:
+        return index in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def keys(self):
+        return self._entries.keys()
+
+    def values(self):
+        return self._entries.values()
+
+    def items(self):
+        return self._entries.items()
+
+
+ # 用于存储验证者的注册表
  
-verifiers = {}
+verifiers = VerifierRegistry()
+
+# request_id 到验证请求的全局索引，由 Verifier.add_verification_request 维护
+request_index: Dict[bytes, VerificationRequest] = {}
+
+# 存储后端，默认不持久化，通过 set_store 切换
+store = MemoryStore()
+
+# 已知验证结果的缓存
+verdict_cache = VerdictCache()
+
+# 会话和请求编号使用的熵池（如 EncryptHardware.EntropyPool），为 None 时直接使用 os.urandom
+entropy_pool = None
+
+def set_entropy_pool(pool):
+    global entropy_pool
+    entropy_pool = pool
+
+def random_bytes(size: int) -> bytes:
+    # 熵池的 take 不会阻塞，池空时自行退回 os.urandom
+    if entropy_pool is None:
+        return os.urandom(size)
+    return entropy_pool.take(size)
+
+def set_store(new_store):
+    """
+    切换存储后端，并从中恢复验证者和验证请求。
+    进程正常退出时关闭存储，后台写线程中尚未提交的写操作会先落盘。
+    """
+    global store
+    store = new_store
+    atexit.register(new_store.close)
+    # 表中的 idx 可能来自多个进程，恢复时按顺序重新编号
+    verifiers.restore(
+        (index, verifier_id, Verifier(session_id, public_key))
+        for index, (_, verifier_id, session_id, public_key) in enumerate(store.load_verifiers()))
+    for row in store.load_requests():
+        verification_request = VerificationRequest(*row)
+        verifier = verifiers.get_by_public_key(verification_request.verifier_public_key)
+        if verifier is not None:
+            verifier.restore_verification_request(verification_request)
 
 def generate_session_id():
-    return str(uuid.uuid4())
+    return str(uuid.UUID(bytes=random_bytes(16), version=4))
 
-def select_verifier(verifier_hash):
-    # 使用 verifier_hash 来确定性地选择一个验证者
-    hash_int = int.from_bytes(verifier_hash, byteorder='big')
-    index = hash_int % len(verifiers)
-    return list(verifiers.values())[index]
+def select_verifier(verifier_hash, strategy: str = 'hash'):
+    # 使用 verifier_hash 在一致性哈希环上选择一个验证者
+    return verifiers.select(verifier_hash, strategy)
 
 def create_verification_request(request_public_key,selected_verifier_public_key,verification_hash, hash_signature):
-    return VerificationRequest(str(os.urandom(16)),request_public_key,selected_verifier_public_key,verification_hash,hash_signature,'pending')
+    # 相同的签名已有验证结果时，直接使用缓存的结果
+    verdict = verdict_cache.get(VerdictCache.key(request_public_key, verification_hash, hash_signature))
+    verification_status = 'pending' if verdict is None else verdict
+    return VerificationRequest(random_bytes(16),request_public_key,selected_verifier_public_key,verification_hash,hash_signature,verification_status)
+
+def submit_verification_request(request_public_key, verification_hash, hash_signature, strategy: str = 'hash') -> Optional[VerificationRequest]:
+    """
+    选择验证者、创建签名验证请求并加入其队列；没有可用验证者时返回 None。
+    命中验证结果缓存的请求已带有结果，只建立索引，不推送给验证者。
+    """
+    selected_entry = select_verifier(verification_hash, strategy)
+    if selected_entry is None:
+        return None
+    selected_verifier = selected_entry["verifier"]
+    verification_request = create_verification_request(request_public_key, selected_verifier.public_key, verification_hash, hash_signature)
+    selected_verifier.add_verification_request(verification_request)
+    return verification_request
+
+def _request_id_bytes(request_id) -> Optional[bytes]:
+    # 接口中的 request_id 是十六进制字符串；其他类型或长度不是 16 字节时返回 None
+    if isinstance(request_id, str):
+        try:
+            request_id = bytes.fromhex(request_id)
+        except ValueError:
+            return None
+    if not isinstance(request_id, bytes) or len(request_id) != 16:
+        return None
+    return request_id
+
+def find_verification_request(request_id) -> Optional[VerificationRequest]:
+    return request_index.get(_request_id_bytes(request_id))
+
+def record_verification_result(request_id, verification_status) -> Optional[VerificationRequest]:
+    """
+    按 request_id（十六进制字符串或 16 字节）更新验证结果，找不到时返回 None。
+    """
+    verification_request = request_index.get(_request_id_bytes(request_id))
+    if verification_request is not None:
+        verifier = verifiers.get_by_public_key(verification_request.verifier_public_key)
+        if verifier is not None:
+            verifier.set_verification_status(verification_request, verification_status)
+        else:
+            verification_request.verification_status = verification_status
+        store.update_status(verification_request.request_id, verification_status)
+        # 只缓存布尔结果；/verify_result/ 可能提交任意值
+        if isinstance(verification_status, bool):
+            verdict_cache.put(VerdictCache.key(
+                verification_request.request_public_key,
+                verification_request.verification_hash,
+                verification_request.hash_signature), verification_status)
+    return verification_request
+
+def configure_from_environment():
+    """
+    按环境变量配置服务端共享的存储和熵池，main.py 和 asgi.py 启动时调用。
+    VERIFY_DB：验证者和验证请求持久化到该 SQLite 文件，并在启动时恢复。
+    ENTROPY_PORT / ENTROPY_BAUD_RATE：会话和请求编号从该串口加密设备的硬件随机数预取。
+    """
+    if os.getenv("VERIFY_DB"):
+        from storage import SQLiteStore
+        set_store(SQLiteStore(os.getenv("VERIFY_DB")))
+    if os.getenv("ENTROPY_PORT"):
+        from EncryptHardware.EncryptionHardwarePort import EncryptionHardwarePort
+        from EncryptHardware.EntropyPool import EntropyPool, hardware_source
+        set_entropy_pool(EntropyPool(hardware_source(
+            EncryptionHardwarePort(os.getenv("ENTROPY_PORT"), int(os.getenv("ENTROPY_BAUD_RATE", default=460800))))))
+
+def requests_json(verification_requests) -> str:
+    return "[" + ", ".join(verification_request.to_json() for verification_request in verification_requests) + "]"
+
+def submit_batch_record(index: int, record, strategy: str = 'hash') -> str:
+    """
+    处理批量接口的一条记录（dict，或一行 JSON 的 bytes/str），返回对应的 NDJSON 行（不含换行）。
+    单条记录出错只影响该条：格式错误或没有可用验证者时返回带 error 的行。
+    """
+    try:
+        if isinstance(record, (bytes, str)):
+            record = json.loads(record)
+        verification_request = submit_verification_request(
+            base64.b64decode(record['public_key']),
+            base64.b64decode(record['verifier_hash']),
+            base64.b64decode(record['hash_signature']),
+            strategy)
+    except (KeyError, TypeError, ValueError) as e:
+        return json.dumps({"index": index, "error": f"Invalid record: {e}"})
+    if verification_request is None:
+        return json.dumps({"index": index, "error": "No verifier available"})
+    return f'{{"index": {index}, "request": {verification_request.to_json()}}}'
+
+def parse_subscribe_options(data, max_timeout: float):
+    """
+    校验订阅接口的 timeout 和 max_batch，返回 (timeout, max_batch)。
+    timeout 限制在 [0, max_timeout]，max_batch 至少为 1；无法解析时抛出 ValueError。
+    """
+    try:
+        timeout = float(data.get('timeout', 30))
+        max_batch = int(data.get('max_batch', 100))
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError("timeout must be a number and max_batch an integer")
+    if math.isnan(timeout):
+        raise ValueError("timeout must be a number")
+    return min(max(timeout, 0.0), max_timeout), max(max_batch, 1)
+
+def verify_requests(verification_requests, engine: verify_engine.SignatureVerificationEngine) -> List[bool]:
+    """
+    用验证引擎批量验证请求，并通过 record_verification_result 回写结果。
+    """
+    verification_requests = list(verification_requests)
+    verdicts = engine.verify_batch(
+        (r.request_public_key, r.verification_hash, r.hash_signature) for r in verification_requests)
+    for verification_request, verdict in zip(verification_requests, verdicts):
+        record_verification_result(verification_request.request_id, verdict)
+    return verdicts
@@ -0,0 +1,103 @@
+"""
+软件 ECDSA 签名验证引擎。
+在进程内检查 hash_signature 是否是 request_public_key 对 verification_hash 的签名，
+不需要经过串口设备；批量验证时分块交给进程池，利用多个 CPU 核心。
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import ec, utils
+
+# 支持的曲线，按名称传递以便跨进程
+CURVES = {
+    'secp256r1': ec.SECP256R1,
+    'secp256k1': ec.SECP256K1,
+    'secp384r1': ec.SECP384R1,
+}
+DEFAULT_CURVE = 'secp256r1'
+
+# 按摘要长度确定预哈希算法
+PREHASHED_ALGORITHMS = {
+    20: hashes.SHA1,
+    32: hashes.SHA256,
+    48: hashes.SHA384,
+    64: hashes.SHA512,
+}
+
+
+@lru_cache(maxsize=4096)
+def _load_public_key(curve_name: str, public_key: bytes) -> ec.EllipticCurvePublicKey:
+    # 同一上传者的公钥会反复出现，解析结果缓存在各自进程中
+    return ec.EllipticCurvePublicKey.from_encoded_point(CURVES[curve_name](), public_key)
+
+
+def verify_signature(public_key: bytes, verification_hash: bytes, hash_signature: bytes,
+                     curve_name: str = DEFAULT_CURVE) -> bool:
+    """
+    验证 ECDSA 签名。
+    :param public_key: SEC1 编码的公钥（压缩或非压缩）。
+    :param verification_hash: 被签名的摘要。
+    :param hash_signature: DER 编码或 r||s 原始格式的签名。
+    :return: 签名有效返回 True，否则（包括格式错误）返回 False。
+    """
+    algorithm = PREHASHED_ALGORITHMS.get(len(verification_hash))
+    if algorithm is None:
+        return False
+    try:
+        key = _load_public_key(curve_name, bytes(public_key))
+        size = (key.curve.key_size + 7) // 8
+        if len(hash_signature) == 2 * size:
+            # 硬件输出的 r||s 原始签名转为 DER
+            hash_signature = utils.encode_dss_signature(
+                int.from_bytes(hash_signature[:size], 'big'),
+                int.from_bytes(hash_signature[size:], 'big'))
+        key.verify(hash_signature, verification_hash, ec.ECDSA(utils.Prehashed(algorithm())))
+        return True
+    except (InvalidSignature, ValueError):
+        return False
+
+
+def _verify_chunk(curve_name: str, chunk: List[Tuple[bytes, bytes, bytes]]) -> List[bool]:
+    return [verify_signature(public_key, verification_hash, hash_signature, curve_name)
+            for public_key, verification_hash, hash_signature in chunk]
+
+
+class SignatureVerificationEngine:
+    """
+    批量签名验证引擎。
+    :param workers: 进程数，默认等于 CPU 核心数；为 1 时在当前进程内验证。
+    :param chunk_size: 每次交给子进程的签名数量，用于摊薄进程间通信的开销。
+    """
+    def __init__(self, workers: Optional[int] = None, chunk_size: int = 256, curve_name: str = DEFAULT_CURVE):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.curve_name = curve_name
+        self._pool = ProcessPoolExecutor(self.workers) if self.workers > 1 else None
+
+    def verify_batch(self, items: Iterable[Tuple[bytes, bytes, bytes]]) -> List[bool]:
+        """
+        验证一批 (public_key, verification_hash, hash_signature)，按输入顺序返回结果。
+        """
+        items = list(items)
+        if self._pool is None:
+            return _verify_chunk(self.curve_name, items)
+        chunks = [items[i:i + self.chunk_size] for i in range(0, len(items), self.chunk_size)]
+        results: List[bool] = []
+        for verdicts in self._pool.map(_verify_chunk, [self.curve_name] * len(chunks), chunks):
+            results.extend(verdicts)
+        return results
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()